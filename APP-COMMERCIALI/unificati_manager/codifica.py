@@ -2,44 +2,48 @@ from __future__ import annotations
 
 import re
 
+_NON_DIGIT_RE = re.compile(r"[^0-9]")
+_THREE_DIGITS_RE = re.compile(r"[0-9]{3}")
+_FOUR_DIGITS_RE = re.compile(r"[0-9]{4}")
+
 
 # ---- Normati helpers ----
 def normalize_mmm(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"[^0-9]", "", s)
+    s = _NON_DIGIT_RE.sub("", s)
     return s[:3]
 
 
 def normalize_gggg_normati(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"[^0-9]", "", s)
+    s = _NON_DIGIT_RE.sub("", s)
     return s[:4]
 
 
 def is_valid_mmm(s: str) -> bool:
-    return bool(re.fullmatch(r"[0-9]{3}", s or ""))
+    return _THREE_DIGITS_RE.fullmatch(s or "") is not None
 
 
 def is_valid_gggg_normati(s: str) -> bool:
-    return bool(re.fullmatch(r"[0-9]{4}", s or ""))
+    return _FOUR_DIGITS_RE.fullmatch(s or "") is not None
 
 
 # ---- Commerciali (non normati) helpers ----
 def normalize_cccc(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"[^0-9]", "", s)
+    s = _NON_DIGIT_RE.sub("", s)
     return s[:4]
 
 
 def normalize_ssss(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"[^0-9]", "", s)
+    s = _NON_DIGIT_RE.sub("", s)
     return s[:4]
 
 
 def is_valid_cccc(s: str) -> bool:
-    return bool(re.fullmatch(r"[0-9]{4}", s or ""))
+    return _FOUR_DIGITS_RE.fullmatch(s or "") is not None
 
 
 def is_valid_ssss(s: str) -> bool:
-    return bool(re.fullmatch(r"[0-9]{4}", s or ""))
+    return _FOUR_DIGITS_RE.fullmatch(s or "") is not None
@@ -24,6 +24,17 @@ SEED_NORMATI_DEFAULTS = False
 SEED_COMMERCIALI_DEFAULTS = False
 SEED_SUPPLIERS_DEFAULTS = False
 
+# Tuning SQLite applicato all'apertura del DB.
+# Il DB e condiviso tra piu PC (anche da cartella di rete): di default il journal resta quello del file
+# e mmap e spento. WAL (es. "WAL") e mmap (byte, es. 268435456) solo su opt-in con DB su disco locale:
+# journal_mode=WAL viene scritto nel file e vale poi per tutti i client.
+SQLITE_JOURNAL_MODE = ""
+SQLITE_SYNCHRONOUS = "NORMAL"
+SQLITE_CACHE_SIZE_KB = 20000
+SQLITE_MMAP_SIZE = 0
+# Statement preparati tenuti in cache per connessione (default sqlite3: 128; il DB ne usa di piu).
+SQLITE_CACHED_STATEMENTS = 512
+
 DATE_FMT = "%Y-%m-%d %H:%M:%S"
 
 
@@ -5,17 +5,32 @@ import os
 import re
 import sqlite3
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from .utils import now_str, normalize_upper
-from .codifica import normalize_mmm, normalize_gggg_normati, normalize_cccc, normalize_ssss
+from .codifica import (
+    is_valid_cccc,
+    is_valid_gggg_normati,
+    is_valid_mmm,
+    is_valid_ssss,
+    normalize_cccc,
+    normalize_gggg_normati,
+    normalize_mmm,
+    normalize_ssss,
+)
 from .config import (
     DATE_FMT,
     SEED_COMMERCIALI_DEFAULTS,
     SEED_NORMATI_DEFAULTS,
     SEED_SUPPLIERS_DEFAULTS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_CACHED_STATEMENTS,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
 )
 
 DEFAULT_NORMATI_CATEGORIES = [
@@ -111,6 +126,25 @@ DEFAULT_MATERIAL_PROPERTY_ALIASES = [
 ]
 
 
+# Riassunto di un gruppo di proprieta per l'elenco materiali: prime 3 "NOME=VALORE" non vuote
+# (ordine di fetch_material_properties) e " | ..." se il gruppo ha altre righe.
+_MATERIAL_SUMMARY_SQL = """
+COALESCE((
+    SELECT GROUP_CONCAT(tok, ' | ') FROM (
+        SELECT CASE WHEN TRIM(COALESCE(value, ''))='' THEN TRIM(name) ELSE TRIM(name) || '=' || TRIM(value) END AS tok
+        FROM material_property
+        WHERE material_id=m.id AND prop_group='{group}' AND TRIM(COALESCE(name, ''))<>''
+        ORDER BY state_code, sort_order, name
+        LIMIT 3
+    )
+) || CASE WHEN (SELECT COUNT(*) FROM material_property WHERE material_id=m.id AND prop_group='{group}') > 3
+          THEN ' | ...' ELSE '' END, '')
+"""
+_MATERIAL_SUMMARY_COLUMNS = ", ".join(
+    f"{_MATERIAL_SUMMARY_SQL.format(group=g)} AS {alias}" for g, alias in (("CHEM", "chem"), ("PHYS", "phys"), ("MECH", "mech"))
+)
+
+
 class Database:
     def __init__(
         self,
@@ -129,17 +163,30 @@ class Database:
         self.writer_holder = (writer_holder or "").strip()
         self.writer_lock_token = writer_lock_token
         self.writer_lock_timeout_seconds = max(15, int(writer_lock_timeout_seconds or 120))
+        self._fts_tables: Dict[str, bool] = {}
 
         if self.is_read_only:
             uri = f"{Path(self.path).as_uri()}?mode=ro"
-            self.conn = sqlite3.connect(uri, timeout=30, uri=True)
+            self.conn = sqlite3.connect(uri, timeout=30, uri=True, cached_statements=SQLITE_CACHED_STATEMENTS)
         else:
             os.makedirs(os.path.dirname(self.path), exist_ok=True)
-            self.conn = sqlite3.connect(self.path, timeout=30)
+            self.conn = sqlite3.connect(self.path, timeout=30, cached_statements=SQLITE_CACHED_STATEMENTS)
         self.conn.row_factory = sqlite3.Row
         self.conn.execute("PRAGMA foreign_keys=ON;")
         self.conn.execute("PRAGMA busy_timeout=30000;")
+        self.conn.execute("PRAGMA temp_store=MEMORY;")
+        self.conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)};")
+        self.fts_supported = self._probe_fts_trigram()
+        if SQLITE_MMAP_SIZE:
+            self.conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)};")
         if not self.is_read_only:
+            # Senza opt-in si legge soltanto il journal corrente del file, senza cambiarlo.
+            journal_sql = f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE};" if SQLITE_JOURNAL_MODE else "PRAGMA journal_mode;"
+            row = self.conn.execute(journal_sql).fetchone()
+            self.journal_mode = str(row[0]).lower() if row else ""
+            # synchronous=NORMAL e sicuro solo in WAL: negli altri journal resta il default (FULL).
+            if self.journal_mode == "wal":
+                self.conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS};")
             self._init_schema()
             self._seed_defaults()
             self._backfill_semi_dimensions_from_legacy_field()
@@ -152,6 +199,12 @@ class Database:
         except Exception:
             pass
 
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Blocco atomico: commit a fine blocco, rollback (e lock rilasciato) in caso di errore."""
+        with self.conn:
+            yield self.conn
+
     @staticmethod
     def _auto_code(prefix: str) -> str:
         return f"{normalize_upper(prefix)}_{uuid.uuid4().hex[:10].upper()}"
@@ -371,7 +424,9 @@ class Database:
             );
             """
         )
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_item_cat_sub ON item(category_id, subcategory_id)")
+        # seq in coda: MAX(seq) per categoria/sotto-categoria (get_next_seq) si legge dall'indice.
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_item_cat_sub_seq ON item(category_id, subcategory_id, seq)")
+        cur.execute("DROP INDEX IF EXISTS idx_item_cat_sub")
         cur.execute("CREATE INDEX IF NOT EXISTS idx_item_code ON item(code)")
 
         # Commerciali non normati
@@ -615,6 +670,14 @@ class Database:
         self._ensure_column("material_property", "state_code", "TEXT NOT NULL DEFAULT ''")
         self._ensure_column("semi_item", "material_id", "INTEGER")
         self._ensure_column("semi_item_dimension", "preferred", "INTEGER NOT NULL DEFAULT 0")
+        # Ordinamento dell'elenco normati (preferiti, poi piu recenti): il primo indice serve
+        # il filtro categoria + sotto-categoria, il secondo l'elenco senza filtri.
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_item_cat_sub_pref_upd "
+            "ON item(category_id, subcategory_id, preferred, updated_at)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_item_pref_upd ON item(preferred, updated_at)")
+        self.conn.commit()
         try:
             self.conn.execute(
                 """
@@ -626,6 +689,86 @@ class Database:
             self.conn.commit()
         except sqlite3.OperationalError:
             pass
+        self._ensure_fts("manual_version", ("version", "updates"))
+        self._ensure_fts("item", ("code", "description"))
+
+    def _probe_fts_trigram(self) -> bool:
+        """True se questa build di SQLite ha FTS5 con tokenizer trigram (SQLite >= 3.34)."""
+        try:
+            self.conn.execute("CREATE VIRTUAL TABLE temp._fts_probe USING fts5(x, tokenize='trigram')")
+            self.conn.execute("DROP TABLE temp._fts_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def _fts_triggers(self, table: str) -> List[str]:
+        cur = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='trigger' AND name IN (?, ?, ?)",
+            tuple(f"{table}_fts_{s}" for s in ("ai", "ad", "au")),
+        )
+        return [r["name"] for r in cur.fetchall()]
+
+    def _ensure_fts(self, table: str, columns: Tuple[str, ...]) -> None:
+        # Indice full-text (trigram) su `table`, allineato da trigger; se FTS5 manca resta la ricerca LIKE.
+        # Il DB e condiviso: i trigger scritti da un client con FTS5 farebbero fallire ogni INSERT/UPDATE/DELETE
+        # su `table` nei client senza FTS5 o trigram (SQLite < 3.34). Questi client tolgono i trigger;
+        # un client con FTS5 li ricrea e ricostruisce l'indice alla prossima apertura.
+        fts = f"{table}_fts"
+        triggers = self._fts_triggers(table)
+        if not self.fts_supported:
+            if triggers:
+                with self.transaction() as conn:
+                    for name in triggers:
+                        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            self._fts_tables[table] = False
+            return
+        if len(triggers) == 3:
+            self._fts_tables[table] = True
+            return
+        cols = ", ".join(columns)
+        new_vals = ", ".join(f"new.{c}" for c in columns)
+        old_vals = ", ".join(f"old.{c}" for c in columns)
+        try:
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id', tokenize='trigram')"
+            )
+            self.conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals});
+                END
+                """
+            )
+            self.conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+                END
+                """
+            )
+            self.conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals});
+                END
+                """
+            )
+            self.conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+            self.conn.commit()
+            self._fts_tables[table] = True
+        except sqlite3.OperationalError:
+            self.conn.rollback()
+            self._fts_tables[table] = False
+
+    def _has_fts(self, table: str) -> bool:
+        if not self.fts_supported:
+            return False
+        if table not in self._fts_tables:
+            # Indice utilizzabile solo se allineato dai tre trigger (un client senza FTS5 puo averli tolti).
+            self._fts_tables[table] = len(self._fts_triggers(table)) == 3
+        return self._fts_tables[table]
 
     def _seed_defaults(self) -> None:
         cur = self.conn.cursor()
@@ -1091,12 +1234,27 @@ class Database:
                 params.append(f"%{esc}%")
         where.append("(" + " OR ".join(parts) + ")")
 
+    def _append_item_fts_where(self, token: str, quoted: bool, where: List[str], params: List[Any]) -> bool:
+        """Token di sottostringa (>= 3 caratteri) cercato su item_fts; False se serve la ricerca LIKE."""
+        tok = normalize_upper(token or "")
+        if len(tok) < 3 or (quoted and " " not in tok) or self._is_dimension_like_token(tok):
+            return False
+        # Il trigram equivale a LIKE '%tok%' su codice e descrizione; i codici categoria/sotto restano in LIKE.
+        esc = self._escape_like(tok)
+        where.append(
+            "(i.id IN (SELECT rowid FROM item_fts WHERE item_fts MATCH ?)"
+            " OR UPPER(c.code) LIKE ? ESCAPE '\\' OR UPPER(sc.code) LIKE ? ESCAPE '\\')"
+        )
+        params.extend(['"' + tok.replace('"', '""') + '"', f"%{esc}%", f"%{esc}%"])
+        return True
+
     def search_items(
         self,
         q: str = "",
         category_id: Optional[int] = None,
         subcategory_id: Optional[int] = None,
         only_preferred: bool = False,
+        item_id: Optional[int] = None,
     ):
         q = (q or "").strip()
         cur = self.conn.cursor()
@@ -1105,14 +1263,18 @@ class Database:
         sql = """
             SELECT i.id, i.code, i.description, i.updated_at,
                    c.code AS cat_code, sc.code AS sub_code,
-                   COALESCE(i.preferred, 0) AS preferred
+                   i.preferred,
+                   CASE WHEN i.preferred THEN 'X' ELSE '' END AS pref_flag
             FROM item i
             JOIN category c ON c.id=i.category_id
             JOIN subcategory sc ON sc.id=i.subcategory_id
         """
         tokens = self._parse_search_tokens(q)
+        use_fts = self._has_fts("item")
         for tok, quoted in tokens:
             # Regola 2: token in AND (ogni token aggiunge una clausola).
+            if use_fts and self._append_item_fts_where(tok, quoted, where, params):
+                continue
             self._append_token_where(
                 fields_sql=["i.code", "i.description", "c.code", "sc.code"],
                 token=tok,
@@ -1127,10 +1289,15 @@ class Database:
             where.append("i.subcategory_id=?")
             params.append(int(subcategory_id))
         if only_preferred:
-            where.append("COALESCE(i.preferred, 0)=1")
+            where.append("i.preferred=1")
+        if item_id is not None:
+            where.append("i.id=?")
+            params.append(int(item_id))
         if where:
             sql += " WHERE " + " AND ".join(where)
-        sql += " ORDER BY COALESCE(i.preferred, 0) DESC, i.updated_at DESC"
+        # L'ORDER BY evita il sort temporaneo senza filtri (idx_item_pref_upd) o con categoria
+        # e sotto-categoria entrambe filtrate (idx_item_cat_sub_pref_upd).
+        sql += " ORDER BY i.preferred DESC, i.updated_at DESC"
         cur.execute(sql, tuple(params))
         return cur.fetchall()
 
@@ -1158,7 +1325,7 @@ class Database:
     # Normati CRUD (categorie/norme/sotto/articoli)
     def create_category(self, code: str, description: str) -> None:
         code_n = normalize_mmm(code)
-        if not re.fullmatch(r"[0-9]{3}", code_n):
+        if not is_valid_mmm(code_n):
             raise ValueError("CODICE categoria normati non valido: servono 3 numeri.")
         cur = self.conn.cursor()
         cur.execute("INSERT INTO category(code, description) VALUES(?, ?)", (code_n, normalize_upper(description)))
@@ -1194,7 +1361,7 @@ class Database:
 
     def create_subcategory(self, category_id: int, code: str, description: str, standard_id: Optional[int], desc_template: str) -> None:
         code_n = normalize_gggg_normati(code)
-        if not re.fullmatch(r"[0-9]{4}", code_n):
+        if not is_valid_gggg_normati(code_n):
             raise ValueError("CODICE sotto-categoria normati non valido: servono 4 numeri.")
         cur = self.conn.cursor()
         cur.execute(
@@ -1298,6 +1465,7 @@ class Database:
         subcategory_id: Optional[int] = None,
         supplier_id: Optional[int] = None,
         only_preferred: bool = False,
+        item_id: Optional[int] = None,
     ):
         q = (q or "").strip()
         cur = self.conn.cursor()
@@ -1308,7 +1476,10 @@ class Database:
                    c.code AS cat_code, sc.code AS sub_code,
                    s.code AS sup_code,
                    i.supplier_item_code, i.supplier_item_desc,
-                   COALESCE(i.preferred, 0) AS preferred
+                   COALESCE(i.preferred, 0) AS preferred,
+                   CASE WHEN COALESCE(i.preferred, 0) THEN 'X' ELSE '' END AS pref_flag,
+                   CAST(i.id AS TEXT) AS iid,
+                   COALESCE(s.code, '') AS sup_label
             FROM comm_item i
             JOIN comm_category c ON c.id=i.category_id
             JOIN comm_subcategory sc ON sc.id=i.subcategory_id
@@ -1343,12 +1514,30 @@ class Database:
             params.append(int(supplier_id))
         if only_preferred:
             where.append("COALESCE(i.preferred, 0)=1")
+        if item_id is not None:
+            where.append("i.id=?")
+            params.append(int(item_id))
         if where:
             sql += " WHERE " + " AND ".join(where)
         sql += " ORDER BY COALESCE(i.preferred, 0) DESC, i.updated_at DESC"
         cur.execute(sql, tuple(params))
         return cur.fetchall()
 
+    def fetch_commercial_bootstrap(self, **search_kwargs: Any):
+        """Categorie, fornitori e articoli commerciali letti in un'unica transazione."""
+        started = not self.conn.in_transaction
+        if started:
+            self.conn.execute("BEGIN")
+        try:
+            return (
+                self.fetch_comm_categories(),
+                self.fetch_suppliers(),
+                self.search_comm_items(**search_kwargs),
+            )
+        finally:
+            if started:
+                self.conn.commit()
+
     def read_comm_item(self, item_id: int):
         cur = self.conn.cursor()
         cur.execute(
@@ -1370,9 +1559,22 @@ class Database:
         return row
 
     # Commerciali CRUD: categorie/sotto/fornitori/articoli
+    def comm_category_exists(self, code: str) -> bool:
+        cur = self.conn.cursor()
+        cur.execute("SELECT 1 FROM comm_category WHERE code=? LIMIT 1", (normalize_cccc(code),))
+        return cur.fetchone() is not None
+
+    def comm_subcategory_exists(self, category_id: int, code: str) -> bool:
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT 1 FROM comm_subcategory WHERE category_id=? AND code=? LIMIT 1",
+            (int(category_id), normalize_ssss(code)),
+        )
+        return cur.fetchone() is not None
+
     def create_comm_category(self, code: str, description: str) -> None:
         code_n = normalize_cccc(code)
-        if not re.fullmatch(r"[0-9]{4}", code_n):
+        if not is_valid_cccc(code_n):
             raise ValueError("CODICE categoria commerciali non valido: servono 4 numeri.")
         cur = self.conn.cursor()
         cur.execute("INSERT INTO comm_category(code, description) VALUES(?, ?)", (code_n, normalize_upper(description)))
@@ -1384,13 +1586,13 @@ class Database:
         self.conn.commit()
 
     def delete_comm_category(self, category_id: int) -> None:
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM comm_category WHERE id=?", (int(category_id),))
-        self.conn.commit()
+        # Con record collegati la FK fallisce: il rollback evita di lasciare aperta la transazione.
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM comm_category WHERE id=?", (int(category_id),))
 
     def create_comm_subcategory(self, category_id: int, code: str, description: str) -> None:
         code_n = normalize_ssss(code)
-        if not re.fullmatch(r"[0-9]{4}", code_n):
+        if not is_valid_ssss(code_n):
             raise ValueError("CODICE sotto-categoria commerciali non valido: servono 4 numeri.")
         cur = self.conn.cursor()
         cur.execute(
@@ -1405,9 +1607,8 @@ class Database:
         self.conn.commit()
 
     def delete_comm_subcategory(self, subcategory_id: int) -> None:
-        cur = self.conn.cursor()
-        cur.execute("DELETE FROM comm_subcategory WHERE id=?", (int(subcategory_id),))
-        self.conn.commit()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM comm_subcategory WHERE id=?", (int(subcategory_id),))
 
     def create_supplier(self, code: str, description: str) -> None:
         cur = self.conn.cursor()
@@ -1617,22 +1818,26 @@ class Database:
             )
         self.conn.commit()
 
-    def search_materials(self, q: str = ""):
+    def search_materials(self, q: str = "", with_summaries: bool = False):
+        """Materiali filtrati; con `with_summaries` anche i riassunti proprieta (colonne chem/phys/mech)."""
         q = (q or "").strip()
+        cols = "m.id, m.code, m.family, m.description, m.updated_at"
+        if with_summaries:
+            cols += ", " + _MATERIAL_SUMMARY_COLUMNS
         cur = self.conn.cursor()
         if q:
             like = f"%{q}%"
             cur.execute(
-                """
-                SELECT id, code, family, description, updated_at
-                FROM material
-                WHERE code LIKE ? OR family LIKE ? OR description LIKE ?
-                ORDER BY updated_at DESC
+                f"""
+                SELECT {cols}
+                FROM material m
+                WHERE m.code LIKE ? OR m.family LIKE ? OR m.description LIKE ? OR m.standard LIKE ? OR m.notes LIKE ?
+                ORDER BY m.updated_at DESC
                 """,
-                (like, like, like),
+                (like, like, like, like, like),
             )
         else:
-            cur.execute("SELECT id, code, family, description, updated_at FROM material ORDER BY updated_at DESC")
+            cur.execute(f"SELECT {cols} FROM material m ORDER BY m.updated_at DESC")
         return cur.fetchall()
     
     def read_material(self, material_id: int):
@@ -1683,6 +1888,31 @@ class Database:
         )
         return cur.fetchall()
 
+    def fetch_material_bundle(self, material_id: int, include_semis: bool = True) -> Dict[str, list]:
+        """Proprieta di tutti i gruppi (chiave = prop_group) e semilavorati collegati ("semis") in un'unica transazione."""
+        started = not self.conn.in_transaction
+        if started:
+            self.conn.execute("BEGIN")
+        try:
+            cur = self.conn.cursor()
+            cur.execute(
+                """
+                SELECT id, prop_group, state_code, name, unit, value, min_value, max_value, notes, sort_order
+                FROM material_property
+                WHERE material_id=?
+                ORDER BY prop_group, state_code, sort_order, name
+                """,
+                (int(material_id),),
+            )
+            bundle: Dict[str, list] = {}
+            for r in cur.fetchall():
+                bundle.setdefault(r["prop_group"], []).append(r)
+            bundle["semis"] = self.fetch_semis_by_material(material_id) if include_semis else []
+            return bundle
+        finally:
+            if started:
+                self.conn.commit()
+
     def read_material_property_notes(self, prop_id: int) -> str:
         cur = self.conn.cursor()
         cur.execute("SELECT notes FROM material_property WHERE id=?", (int(prop_id),))
@@ -1837,7 +2067,19 @@ class Database:
     def fetch_manual_versions(self, q: str = ""):
         cur = self.conn.cursor()
         qn = (q or "").strip()
-        if qn:
+        if len(qn) >= 3 and self._has_fts("manual_version"):
+            # Il tokenizer trigram equivale a LIKE '%q%' (case-insensitive) ma usa l'indice.
+            cur.execute(
+                """
+                SELECT m.id, m.version, m.release_date, m.updates, m.updated_at
+                FROM manual_version_fts f
+                JOIN manual_version m ON m.id=f.rowid
+                WHERE manual_version_fts MATCH ?
+                ORDER BY m.release_date DESC, m.updated_at DESC, m.id DESC
+                """,
+                ('"' + qn.replace('"', '""') + '"',),
+            )
+        elif qn:
             like = f"%{qn}%"
             cur.execute(
                 """
@@ -2001,9 +2243,10 @@ class Database:
             SELECT si.id,
                    st.description AS type_desc, ss.description AS state_desc,
                    COALESCE(m.family || ' - ' || m.description, '') AS mat_label,
-                   si.description, si.dimensions,
-                   COALESCE(pd.dimension, si.dimensions, '') AS dim_display,
+                   si.description, si.dimensions, si.material_id, si.standard, si.notes,
+                   COALESCE(NULLIF(pd.dimension, ''), si.dimensions, '') AS dim_display,
                    CASE WHEN pd.id IS NULL THEN 0 ELSE 1 END AS has_preferred_dimension,
+                   CASE WHEN pd.id IS NULL THEN '' ELSE 'X' END AS pref_label,
                    si.updated_at
             FROM semi_item si
             JOIN semi_type st ON st.id=si.type_id
@@ -2117,7 +2360,8 @@ class Database:
         cur = self.conn.cursor()
         cur.execute(
             """
-            SELECT id, dimension, weight_per_m, sort_order, COALESCE(preferred, 0) AS preferred
+            SELECT id, dimension, weight_per_m, sort_order, COALESCE(preferred, 0) AS preferred,
+                   CASE WHEN COALESCE(preferred, 0)=1 THEN 'X' ELSE '' END AS pref_label
             FROM semi_item_dimension
             WHERE semi_item_id=?
             ORDER BY sort_order, dimension
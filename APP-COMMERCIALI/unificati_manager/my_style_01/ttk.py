@@ -54,3 +54,25 @@ def configure_treeview_style(root, palette) -> None:
         background=[("active", palette.panel)],
         foreground=[("active", palette.fg)],
     )
+
+    style.configure(
+        "TCombobox",
+        fieldbackground=palette.panel_2,
+        background=palette.panel,
+        foreground=palette.fg,
+        arrowcolor=palette.fg,
+        bordercolor=palette.border,
+        lightcolor=palette.border,
+        darkcolor=palette.border,
+    )
+    style.map(
+        "TCombobox",
+        fieldbackground=[("readonly", palette.panel_2)],
+        foreground=[("readonly", palette.fg)],
+        selectbackground=[("readonly", palette.panel_2)],
+        selectforeground=[("readonly", palette.fg)],
+    )
+    root.option_add("*TCombobox*Listbox.background", palette.panel_2)
+    root.option_add("*TCombobox*Listbox.foreground", palette.fg)
+    root.option_add("*TCombobox*Listbox.selectBackground", palette.selection_bg)
+    root.option_add("*TCombobox*Listbox.selectForeground", palette.selection_fg)
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import os
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config import (
     AUTO_BACKUP_ON_CLOSE,
@@ -17,11 +20,25 @@ from .db import Database
 from .utils import ensure_dir
 
 
+@dataclass(frozen=True)
+class ManualVersion:
+    __slots__ = ("id", "version", "release_date", "updated_at", "updates")
+
+    id: int
+    version: str
+    release_date: str
+    updated_at: str
+    updates: str
+
+
 class AppService:
     """Service layer to keep UI decoupled from the storage implementation."""
 
     def __init__(self, db: Database) -> None:
         self._db = db
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._io_local = threading.local()
+        self._read_cache: Dict[Tuple[str, tuple], Tuple[tuple, Any]] = {}
 
     def __getattr__(self, name: str) -> Any:
         # Delegate existing DB methods to keep current UI code stable.
@@ -32,8 +49,113 @@ class AppService:
         return self._db.path
 
     def close(self) -> None:
+        if self._io is not None:
+            self._io.submit(self._close_io_db)
+            self._io.shutdown(wait=True)
+            self._io = None
         self._db.close()
 
+    def _data_version(self) -> int:
+        # Cambia quando un'altra connessione (altro utente) modifica il DB.
+        return int(self._db.conn.execute("PRAGMA data_version").fetchone()[0])
+
+    def _db_state(self) -> tuple:
+        # data_version cambia con i commit di altre connessioni, total_changes con le scritture di questa.
+        return (self._data_version(), self._db.conn.total_changes)
+
+    def _cached_read(self, method: str, *args: Any) -> Any:
+        """Lettura in cache finche il DB non cambia (nessuna invalidazione manuale nei metodi di scrittura)."""
+        return self._cached_read_at(self._db_state(), method, *args)
+
+    def _cached_read_at(self, state: tuple, method: str, *args: Any) -> Any:
+        key = (method, args)
+        hit = self._read_cache.get(key)
+        if hit is not None and hit[0] == state:
+            return hit[1]
+        rows = getattr(self._db, method)(*args)
+        self._read_cache[key] = (state, rows)
+        return rows
+
+    def fetch_categories(self):
+        return self._cached_read("fetch_categories")
+
+    def fetch_subcategories(self, category_id: int):
+        return self._cached_read("fetch_subcategories", int(category_id))
+
+    def fetch_standards(self, category_id: int):
+        return self._cached_read("fetch_standards", int(category_id))
+
+    def fetch_category_refs(self, category_id: int):
+        """(norme, sotto-categorie) della categoria normati per i due elenchi del tab codifica."""
+        return self._cached_pair("fetch_standards", "fetch_subcategories", int(category_id))
+
+    def fetch_material_families(self):
+        return self._cached_read("fetch_material_families")
+
+    def fetch_material_subfamilies(self, family_id: int):
+        return self._cached_read("fetch_material_subfamilies", int(family_id))
+
+    def fetch_heat_treatments(self):
+        return self._cached_read("fetch_heat_treatments")
+
+    def fetch_surface_treatments(self):
+        return self._cached_read("fetch_surface_treatments")
+
+    def fetch_semi_types(self):
+        return self._cached_read("fetch_semi_types")
+
+    def fetch_semi_states(self):
+        return self._cached_read("fetch_semi_states")
+
+    def _cached_pair(self, first: str, second: str, *args: Any) -> tuple:
+        # Un solo controllo dello stato del DB per le due letture (stessi argomenti).
+        state = self._db_state()
+        return self._cached_read_at(state, first, *args), self._cached_read_at(state, second, *args)
+
+    def fetch_treatments_pair(self):
+        """(trattamenti termici, trattamenti superficiali) per i due elenchi affiancati."""
+        return self._cached_pair("fetch_heat_treatments", "fetch_surface_treatments")
+
+    def fetch_semi_pair(self):
+        """(famiglie, stati) semilavorato per i due elenchi affiancati."""
+        return self._cached_pair("fetch_semi_types", "fetch_semi_states")
+
+    def fetch_comm_categories(self):
+        return self._cached_read("fetch_comm_categories")
+
+    def fetch_manual_versions(self, q: str = "") -> List[ManualVersion]:
+        """Versioni del manuale gia convertite in oggetti (accesso ad attributi, niente sqlite3.Row nella UI)."""
+        return [
+            ManualVersion(
+                id=int(r["id"]),
+                version=r["version"] or "",
+                release_date=r["release_date"] or "",
+                updated_at=r["updated_at"] or "",
+                updates=r["updates"] or "",
+            )
+            for r in self._db.fetch_manual_versions(q)
+        ]
+
+    def _io_db(self) -> Database:
+        # sqlite3 non condivide le connessioni tra thread: il worker usa una connessione sola lettura dedicata.
+        db = getattr(self._io_local, "db", None)
+        if db is None:
+            db = Database(self._db.path, access_mode="ro")
+            self._io_local.db = db
+        return db
+
+    def _close_io_db(self) -> None:
+        db = getattr(self._io_local, "db", None)
+        if db is not None:
+            db.close()
+            self._io_local.db = None
+
+    def submit_read(self, method: str, *args: Any, **kwargs: Any) -> Future:
+        """Esegue un metodo di lettura del DB sul thread di background."""
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-read")
+        return self._io.submit(lambda: getattr(self._io_db(), method)(*args, **kwargs))
+
     def create_periodic_backup(self, reason: str, force: bool = False) -> Optional[str]:
         reason_key = (reason or "").strip().lower()
         if not force:
@@ -2,6 +2,7 @@
 
 import re
 import sqlite3
+import sys
 from typing import Any, Dict, List, Optional
 
 import customtkinter as ctk
@@ -9,7 +10,7 @@ from tkinter import ttk, messagebox, filedialog
 
 from .config import APP_NAME
 from .services import AppService
-from .ui_utils import bind_uppercase, make_treeview_sortable
+from .ui_utils import AutocompleteCombobox, bind_uppercase, code_labels, debounced, get_font, make_treeview_sortable, run_in_background, sync_treeview
 from .codifica import normalize_cccc, normalize_ssss, is_valid_cccc, is_valid_ssss
 
 
@@ -182,18 +183,18 @@ class CommercialArticlesTab(ctk.CTkFrame):
         filters = ctk.CTkFrame(left, fg_color="transparent")
         filters.grid(row=1, column=0, sticky="ew", padx=14, pady=(0, 8))
         filters.grid_columnconfigure((0, 1, 2), weight=1)
-        self.om_filter_cat = ctk.CTkOptionMenu(filters, variable=self.var_filter_cat, values=["TUTTE"], command=self.on_list_filter_cat_changed)
+        self.om_filter_cat = AutocompleteCombobox(filters, variable=self.var_filter_cat, values=["TUTTE"], command=self.on_list_filter_cat_changed)
         self.om_filter_cat.grid(row=0, column=0, sticky="ew", padx=(0, 8))
-        self.om_filter_sub = ctk.CTkOptionMenu(filters, variable=self.var_filter_sub, values=["TUTTE"], command=lambda _v=None: self.refresh_list())
+        self.om_filter_sub = AutocompleteCombobox(filters, variable=self.var_filter_sub, values=["TUTTE"], command=lambda _v=None: self.refresh_list())
         self.om_filter_sub.grid(row=0, column=1, sticky="ew", padx=(0, 8))
-        self.om_filter_supplier = ctk.CTkOptionMenu(filters, variable=self.var_filter_supplier, values=["TUTTI"], command=lambda _v=None: self.refresh_list())
+        self.om_filter_supplier = AutocompleteCombobox(filters, variable=self.var_filter_supplier, values=["TUTTI"], command=lambda _v=None: self.refresh_list())
         self.om_filter_supplier.grid(row=0, column=2, sticky="ew")
 
         filter_flags = ctk.CTkFrame(left, fg_color="transparent")
         filter_flags.grid(row=2, column=0, sticky="ew", padx=14, pady=(0, 8))
         filter_flags.grid_columnconfigure((0, 1), weight=1)
         ctk.CTkCheckBox(filter_flags, text="Solo preferiti", variable=self.var_only_preferred, command=self.refresh_list).grid(row=0, column=0, sticky="w")
-        ctk.CTkButton(filter_flags, text="Aggiorna", command=self.refresh_list).grid(row=0, column=1, sticky="e")
+        ctk.CTkButton(filter_flags, text="Aggiorna", command=lambda: self.refresh_list(force=True)).grid(row=0, column=1, sticky="e")
 
         tree_wrap = ctk.CTkFrame(left, corner_radius=0, fg_color="transparent")
         tree_wrap.grid(row=3, column=0, sticky="nsew", padx=14, pady=(0, 14))
@@ -240,15 +241,15 @@ class CommercialArticlesTab(ctk.CTkFrame):
         bind_uppercase(self.var_sup_item_desc)
 
         ctk.CTkLabel(card, text="Categoria (4 numeri)").grid(row=1, column=0, sticky="w", padx=14)
-        self.om_cat = ctk.CTkOptionMenu(card, variable=self.var_cat, values=["—"], command=self.on_cat_changed)
+        self.om_cat = AutocompleteCombobox(card, variable=self.var_cat, values=["—"], command=self.on_cat_changed)
         self.om_cat.grid(row=2, column=0, sticky="ew", padx=14, pady=(0, 10))
 
         ctk.CTkLabel(card, text="Sotto-categoria (4 numeri)").grid(row=3, column=0, sticky="w", padx=14)
-        self.om_sub = ctk.CTkOptionMenu(card, variable=self.var_sub, values=["—"], command=lambda _v=None: None)
+        self.om_sub = AutocompleteCombobox(card, variable=self.var_sub, values=["—"], command=lambda _v=None: None)
         self.om_sub.grid(row=4, column=0, sticky="ew", padx=14, pady=(0, 10))
 
         ctk.CTkLabel(card, text="Fornitore").grid(row=5, column=0, sticky="w", padx=14)
-        self.om_sup = ctk.CTkOptionMenu(card, variable=self.var_supplier, values=["—"], command=lambda _v=None: None)
+        self.om_sup = AutocompleteCombobox(card, variable=self.var_supplier, values=["—"], command=lambda _v=None: None)
         self.om_sup.grid(row=6, column=0, sticky="ew", padx=14, pady=(0, 10))
 
         ctk.CTkLabel(card, text="Codice fornitore (articolo)").grid(row=7, column=0, sticky="w", padx=14)
@@ -297,21 +298,30 @@ class CommercialArticlesTab(ctk.CTkFrame):
         self._cats: List[sqlite3.Row] = []
         self._subs: List[sqlite3.Row] = []
         self._suppliers: List[sqlite3.Row] = []
+        self._cat_by_label: Dict[str, sqlite3.Row] = {}
         self._sub_by_label: Dict[str, sqlite3.Row] = {}
         self._sup_by_label: Dict[str, sqlite3.Row] = {}
         self._rows_by_iid: Dict[str, sqlite3.Row] = {}
         self._list_filter_cat_by_label: Dict[str, sqlite3.Row] = {}
         self._list_filter_sub_by_label: Dict[str, sqlite3.Row] = {}
         self._list_filter_sup_by_label: Dict[str, sqlite3.Row] = {}
+        self._last_filter_key: Optional[tuple] = None
 
-        self.refresh_reference_data()
-        self.refresh_suppliers()
-        self.refresh_list()
-        self.new_item()
+        cats, suppliers, items = self.db.fetch_commercial_bootstrap()
+        self._apply_categories(cats)
+        self._apply_suppliers(suppliers)
+        self._apply_list(items)
+        self._last_filter_key = tuple(self._list_filter_kwargs().values())
+        # Anagrafiche appena lette dal bootstrap: solo azzeramento del form, senza rileggerle.
+        self._reset_form()
 
     def refresh_reference_data(self) -> None:
-        self._cats = self.db.fetch_comm_categories()
-        cat_values = [f"{c['code']} — {c['description']}" for c in self._cats] or ["—"]
+        self._apply_categories(self.db.fetch_comm_categories())
+
+    def _apply_categories(self, rows: List[sqlite3.Row]) -> None:
+        self._cats = rows
+        self._cat_by_label = code_labels(self._cats)
+        cat_values = list(self._cat_by_label) or ["—"]
         self.om_cat.configure(values=cat_values)
         if self._cats:
             if self.var_cat.get() not in cat_values:
@@ -324,16 +334,18 @@ class CommercialArticlesTab(ctk.CTkFrame):
         self.refresh_list_filters()
 
     def refresh_suppliers(self) -> None:
-        self._suppliers = self.db.fetch_suppliers()
-        values = ["—"]
-        self._sup_by_label = {}
-        for s in self._suppliers:
-            label = f"{s['code']} — {s['description']}"
-            values.append(label)
-            self._sup_by_label[label] = s
+        self._apply_suppliers(self.db.fetch_suppliers())
+
+    def _apply_suppliers(self, rows: List[sqlite3.Row]) -> None:
+        if rows == self._suppliers:
+            return  # fornitori invariati: menu, filtri e memo della ricerca restano validi
+        self._suppliers = rows
+        self._sup_by_label = code_labels(self._suppliers)
+        values = ["—", *self._sup_by_label]
         self.om_sup.configure(values=values)
         if self.var_supplier.get() not in values:
             self.var_supplier.set("—")
+        self._last_filter_key = None
         self.refresh_list_filters()
 
     def refresh_list_filters(self) -> None:
@@ -341,12 +353,8 @@ class CommercialArticlesTab(ctk.CTkFrame):
         cur_sub = self.var_filter_sub.get()
         cur_sup = self.var_filter_supplier.get()
 
-        cat_values = ["TUTTE"]
-        self._list_filter_cat_by_label = {}
-        for c in self._cats:
-            label = f"{c['code']} — {c['description']}"
-            cat_values.append(label)
-            self._list_filter_cat_by_label[label] = c
+        self._list_filter_cat_by_label = code_labels(self._cats)
+        cat_values = ["TUTTE", *self._list_filter_cat_by_label]
         self.om_filter_cat.configure(values=cat_values)
         if cur_cat in cat_values:
             self.var_filter_cat.set(cur_cat)
@@ -355,12 +363,8 @@ class CommercialArticlesTab(ctk.CTkFrame):
 
         self._refresh_list_filter_sub_values(preferred=cur_sub)
 
-        sup_values = ["TUTTI"]
-        self._list_filter_sup_by_label = {}
-        for s in self._suppliers:
-            label = f"{s['code']} — {s['description']}"
-            sup_values.append(label)
-            self._list_filter_sup_by_label[label] = s
+        self._list_filter_sup_by_label = code_labels(self._suppliers)
+        sup_values = ["TUTTI", *self._list_filter_sup_by_label]
         self.om_filter_supplier.configure(values=sup_values)
         if cur_sup in sup_values:
             self.var_filter_supplier.set(cur_sup)
@@ -369,13 +373,8 @@ class CommercialArticlesTab(ctk.CTkFrame):
 
     def _refresh_list_filter_sub_values(self, preferred: Optional[str] = None) -> None:
         cat = self._list_filter_cat_by_label.get(self.var_filter_cat.get())
-        sub_values = ["TUTTE"]
-        self._list_filter_sub_by_label = {}
-        if cat is not None:
-            for sc in self.db.fetch_comm_subcategories(int(cat["id"])):
-                label = f"{sc['code']} — {sc['description']}"
-                sub_values.append(label)
-                self._list_filter_sub_by_label[label] = sc
+        self._list_filter_sub_by_label = code_labels(self.db.fetch_comm_subcategories(int(cat["id"]))) if cat is not None else {}
+        sub_values = ["TUTTE", *self._list_filter_sub_by_label]
         self.om_filter_sub.configure(values=sub_values)
         target = preferred if preferred is not None else self.var_filter_sub.get()
         if target in sub_values:
@@ -388,11 +387,7 @@ class CommercialArticlesTab(ctk.CTkFrame):
         self.refresh_list()
 
     def _get_selected_cat(self) -> Optional[sqlite3.Row]:
-        label = (self.var_cat.get() or "").strip()
-        if "—" not in label:
-            return None
-        code = label.split("—", 1)[0].strip()
-        return next((c for c in self._cats if c["code"] == code), None)
+        return self._cat_by_label.get(self.var_cat.get())
 
     def on_cat_changed(self, _val: str) -> None:
         cat = self._get_selected_cat()
@@ -403,14 +398,8 @@ class CommercialArticlesTab(ctk.CTkFrame):
             self.var_sub.set("—")
             return
         self._subs = self.db.fetch_comm_subcategories(int(cat["id"]))
-        sub_values = []
-        self._sub_by_label = {}
-        for sc in self._subs:
-            label = f"{sc['code']} — {sc['description']}"
-            sub_values.append(label)
-            self._sub_by_label[label] = sc
-        if not sub_values:
-            sub_values = ["—"]
+        self._sub_by_label = code_labels(self._subs)
+        sub_values = list(self._sub_by_label) or ["—"]
         self.om_sub.configure(values=sub_values)
         if self.var_sub.get() not in sub_values:
             self.var_sub.set(sub_values[0])
@@ -420,27 +409,64 @@ class CommercialArticlesTab(ctk.CTkFrame):
         if path:
             self.var_folder.set(path)
 
-    def refresh_list(self) -> None:
+    def _list_filter_kwargs(self) -> Dict[str, Any]:
         cat = self._list_filter_cat_by_label.get(self.var_filter_cat.get())
         sc = self._list_filter_sub_by_label.get(self.var_filter_sub.get())
         sup = self._list_filter_sup_by_label.get(self.var_filter_supplier.get())
-        rows = self.db.search_comm_items(
-            self.q_var.get(),
-            category_id=int(cat["id"]) if cat is not None else None,
-            subcategory_id=int(sc["id"]) if sc is not None else None,
-            supplier_id=int(sup["id"]) if sup is not None else None,
-            only_preferred=bool(self.var_only_preferred.get()),
-        )
+        return {
+            "q": self.q_var.get(),
+            "category_id": int(cat["id"]) if cat is not None else None,
+            "subcategory_id": int(sc["id"]) if sc is not None else None,
+            "supplier_id": int(sup["id"]) if sup is not None else None,
+            "only_preferred": bool(self.var_only_preferred.get()),
+        }
+
+    @staticmethod
+    def _list_values(r: sqlite3.Row) -> tuple:
+        return (r["pref_flag"], r["code"], r["cat_code"], r["sub_code"], r["sup_label"], r["description"], r["updated_at"])
+
+    def refresh_list(self, force: bool = False) -> None:
+        kwargs = self._list_filter_kwargs()
+        key = tuple(kwargs.values())
+        if not force and key == self._last_filter_key:
+            return
+        self._last_filter_key = key
+        self._apply_list(self.db.search_comm_items(**kwargs))
+
+    def _apply_list(self, rows: List[sqlite3.Row]) -> None:
         for i in self.tree.get_children():
             self.tree.delete(i)
         self._rows_by_iid = {}
         for r in rows:
-            iid = str(r["id"])
+            iid = sys.intern(r["iid"])
             self._rows_by_iid[iid] = r
-            pref = "X" if int(r["preferred"] or 0) else ""
-            self.tree.insert("", "end", iid=iid, values=(pref, r["code"], r["cat_code"], r["sub_code"], r["sup_code"] or "", r["description"], r["updated_at"]))
+            self.tree.insert("", "end", iid=iid, values=self._list_values(r))
+
+    def _refresh_list_row(self, item_id: int) -> None:
+        """Aggiorna solo la riga dell'articolo salvato, rispettando filtri e ordinamento dell'elenco."""
+        iid = sys.intern(str(item_id))
+        rows = self.db.search_comm_items(item_id=item_id, **self._list_filter_kwargs())
+        if not rows:
+            # L'articolo non rientra piu nei filtri attivi.
+            self._rows_by_iid.pop(iid, None)
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+            return
+        r = rows[0]
+        self._rows_by_iid[iid] = r
+        # Ordine elenco: preferiti prima, poi ultimo aggiornamento (la riga salvata e la piu recente).
+        idx = 0 if r["pref_flag"] else sum(1 for k, x in self._rows_by_iid.items() if x["pref_flag"] and k != iid)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self._list_values(r))
+            self.tree.move(iid, "", idx)
+        else:
+            self.tree.insert("", idx, iid=iid, values=self._list_values(r))
 
     def new_item(self) -> None:
+        self._reset_form()
+        self._refresh_refs_async()
+
+    def _reset_form(self) -> None:
         self.current_item_id = None
         self.current_seq = None
         self.var_code.set("—")
@@ -451,8 +477,11 @@ class CommercialArticlesTab(ctk.CTkFrame):
         self.var_sup_item_code.set("")
         self.var_sup_item_desc.set("")
         self.txt_notes.delete("1.0", "end")
-        self.refresh_reference_data()
-        self.refresh_suppliers()
+
+    def _refresh_refs_async(self) -> None:
+        # Letture in background: il form resta reattivo anche con anagrafiche grandi.
+        run_in_background(self, self.db.submit_read("fetch_comm_categories"), self._apply_categories)
+        run_in_background(self, self.db.submit_read("fetch_suppliers"), self._apply_suppliers)
 
     def on_select(self, _evt=None) -> None:
         sel = self.tree.selection()
@@ -476,18 +505,18 @@ class CommercialArticlesTab(ctk.CTkFrame):
 
         cat_label = f"{full['cat_code']} — {full['cat_desc']}"
         self.refresh_reference_data()
-        if cat_label in self.om_cat.cget("values"):
+        if cat_label in self._cat_by_label:
             self.var_cat.set(cat_label)
             self.on_cat_changed(cat_label)
 
         sub_label = f"{full['sub_code']} — {full['sub_desc']}"
-        if sub_label in self.om_sub.cget("values"):
+        if sub_label in self._sub_by_label:
             self.var_sub.set(sub_label)
 
         self.refresh_suppliers()
         if full["sup_code"]:
             sup_label = f"{full['sup_code']} — {full['sup_desc']}"
-            if sup_label in self.om_sup.cget("values"):
+            if sup_label in self._sup_by_label:
                 self.var_supplier.set(sup_label)
         else:
             self.var_supplier.set("—")
@@ -498,8 +527,10 @@ class CommercialArticlesTab(ctk.CTkFrame):
         self.var_desc.set(full["description"] or "")
         self.var_preferred.set(bool(int(full["preferred"] or 0)))
         self.var_folder.set(full["file_folder"] or "")
-        self.txt_notes.delete("1.0", "end")
-        self.txt_notes.insert("1.0", full["notes"] or "")
+        notes = full["notes"] or ""
+        if self.txt_notes.get("1.0", "end-1c") != notes:
+            self.txt_notes.delete("1.0", "end")
+            self.txt_notes.insert("1.0", notes)
 
     def copy_item(self) -> None:
         if not self.current_item_id:
@@ -571,7 +602,8 @@ class CommercialArticlesTab(ctk.CTkFrame):
                 self.db.update_comm_item(self.current_item_id, payload)
             else:
                 self.current_item_id = self.db.create_comm_item(payload)
-            self.refresh_list()
+            self._refresh_list_row(self.current_item_id)
+            self._last_filter_key = None
         except sqlite3.IntegrityError as e:
             messagebox.showerror(APP_NAME, f"Codice duplicato o vincolo violato.\n\n{e}")
         except Exception as e:
@@ -583,6 +615,7 @@ class CommercialArticlesTab(ctk.CTkFrame):
         if not messagebox.askyesno(APP_NAME, "Eliminare definitivamente l'articolo selezionato?"):
             return
         self.db.delete_comm_item(self.current_item_id)
+        self._last_filter_key = None
         self.new_item()
         self.refresh_list()
 
@@ -614,7 +647,7 @@ class CommercialCodingTab(ctk.CTkFrame):
         self.box_cat.pack(fill="both", expand=True, padx=14, pady=(14, 7))
         self.box_cat.grid_columnconfigure(0, weight=1)
         self.box_cat.grid_rowconfigure(2, weight=1)
-        ctk.CTkLabel(self.box_cat, text="Categorie (Commerciali)", font=ctk.CTkFont(size=16, weight="bold")).grid(row=0, column=0, sticky="w", padx=14, pady=(14, 6))
+        ctk.CTkLabel(self.box_cat, text="Categorie (Commerciali)", font=get_font(16, "bold")).grid(row=0, column=0, sticky="w", padx=14, pady=(14, 6))
 
         self.var_cat_code = ctk.StringVar(value="")
         self.var_cat_desc = ctk.StringVar(value="")
@@ -651,14 +684,14 @@ class CommercialCodingTab(ctk.CTkFrame):
         cat_tree_scroll = ttk.Scrollbar(cat_tree_wrap, orient="vertical", command=self.tree_cat.yview)
         self.tree_cat.configure(yscrollcommand=cat_tree_scroll.set)
         cat_tree_scroll.grid(row=0, column=1, sticky="ns")
-        self.tree_cat.bind("<<TreeviewSelect>>", self.on_cat_select)
+        self.tree_cat.bind("<<TreeviewSelect>>", debounced(self, 60, self.on_cat_select))
         make_treeview_sortable(self.tree_cat)
 
         self.box_sub = ctk.CTkFrame(bot_wrap, corner_radius=16)
         self.box_sub.pack(fill="both", expand=True, padx=14, pady=(7, 14))
         self.box_sub.grid_columnconfigure(0, weight=1)
         self.box_sub.grid_rowconfigure(2, weight=1)
-        ctk.CTkLabel(self.box_sub, text="Sotto-categorie (Commerciali)", font=ctk.CTkFont(size=16, weight="bold")).grid(row=0, column=0, sticky="w", padx=14, pady=(14, 6))
+        ctk.CTkLabel(self.box_sub, text="Sotto-categorie (Commerciali)", font=get_font(16, "bold")).grid(row=0, column=0, sticky="w", padx=14, pady=(14, 6))
 
         self.var_sub_code = ctk.StringVar(value="")
         self.var_sub_desc = ctk.StringVar(value="")
@@ -700,6 +733,10 @@ class CommercialCodingTab(ctk.CTkFrame):
 
         self._cats: List[sqlite3.Row] = []
         self._subs: List[sqlite3.Row] = []
+        self._cats_by_iid: Dict[str, sqlite3.Row] = {}
+        self._subs_by_iid: Dict[str, sqlite3.Row] = {}
+        self._cat_values: Dict[str, tuple] = {}
+        self._sub_values: Dict[str, tuple] = {}
         self.refresh_all()
 
     def refresh_all(self) -> None:
@@ -714,28 +751,24 @@ class CommercialCodingTab(ctk.CTkFrame):
 
     def refresh_categories(self) -> None:
         self._cats = self.db.fetch_comm_categories()
-        for i in self.tree_cat.get_children():
-            self.tree_cat.delete(i)
-        for c in self._cats:
-            self.tree_cat.insert("", "end", iid=str(c["id"]), values=(c["code"], c["description"]))
+        self._cats_by_iid = {str(c["id"]): c for c in self._cats}
+        rows = [(str(c["id"]), (c["code"], c["description"])) for c in self._cats]
+        self._cat_values = sync_treeview(self.tree_cat, rows, self._cat_values)
 
     def refresh_subcategories(self) -> None:
         self._subs = []
-        for i in self.tree_sub.get_children():
-            self.tree_sub.delete(i)
-        if not self.selected_category_id:
-            return
-        self._subs = self.db.fetch_comm_subcategories(self.selected_category_id)
-        for sc in self._subs:
-            self.tree_sub.insert("", "end", iid=str(sc["id"]), values=(sc["code"], sc["description"]))
+        if self.selected_category_id:
+            self._subs = self.db.fetch_comm_subcategories(self.selected_category_id)
+        self._subs_by_iid = {str(sc["id"]): sc for sc in self._subs}
+        rows = [(str(sc["id"]), (sc["code"], sc["description"])) for sc in self._subs]
+        self._sub_values = sync_treeview(self.tree_sub, rows, self._sub_values)
 
     def on_cat_select(self, _evt=None) -> None:
         sel = self.tree_cat.selection()
         if not sel:
             return
-        cid = int(sel[0])
-        self.selected_category_id = cid
-        row = next((c for c in self._cats if int(c["id"]) == cid), None)
+        self.selected_category_id = int(sel[0])
+        row = self._cats_by_iid.get(sel[0])
         if row:
             self.var_cat_code.set(row["code"])
             self.var_cat_desc.set(row["description"])
@@ -750,9 +783,8 @@ class CommercialCodingTab(ctk.CTkFrame):
         sel = self.tree_sub.selection()
         if not sel:
             return
-        sid = int(sel[0])
-        self.selected_subcategory_id = sid
-        row = next((s for s in self._subs if int(s["id"]) == sid), None)
+        self.selected_subcategory_id = int(sel[0])
+        row = self._subs_by_iid.get(sel[0])
         if row:
             self.var_sub_code.set(row["code"])
             self.var_sub_desc.set(row["description"])
@@ -778,6 +810,9 @@ class CommercialCodingTab(ctk.CTkFrame):
             else:
                 if not is_valid_cccc(code):
                     raise ValueError("CODICE categoria non valido: servono 4 numeri.")
+                if self.db.comm_category_exists(code):
+                    messagebox.showerror(APP_NAME, "Codice categoria già esistente.")
+                    return
                 self.db.create_comm_category(code, desc)
             self.refresh_categories()
             self.refs_changed_callback()
@@ -822,6 +857,9 @@ class CommercialCodingTab(ctk.CTkFrame):
             else:
                 if not is_valid_ssss(code):
                     raise ValueError("CODICE sotto-categoria non valido: servono 4 numeri.")
+                if self.db.comm_subcategory_exists(self.selected_category_id, code):
+                    messagebox.showerror(APP_NAME, "Codice sotto-categoria già esistente per questa categoria.")
+                    return
                 self.db.create_comm_subcategory(self.selected_category_id, code, desc)
             self.refresh_subcategories()
             self.refs_changed_callback()
@@ -1,21 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, Optional
+import re
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
 
 import customtkinter as ctk
 from tkinter import messagebox, ttk
 
-from .services import AppService
-from .ui_utils import make_treeview_sortable
+from .services import AppService, ManualVersion
+from .ui_utils import TreeviewPager, debounced, get_font, make_treeview_sortable
 
-
-def _row_str(r: Any, key: str, default: str = "") -> str:
-    try:
-        v = r[key]
-    except Exception:
-        v = getattr(r, key, default)
-    return "" if v is None else str(v)
+_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
 
 
 class ManualeTab(ctk.CTkFrame):
@@ -23,15 +18,17 @@ class ManualeTab(ctk.CTkFrame):
         super().__init__(master)
         self.db = db
         self.entry_id: Optional[int] = None
-        self._rows_by_iid: Dict[str, Any] = {}
+        self._rows_by_iid: Dict[str, ManualVersion] = {}
+        self._preview_cache: Dict[str, Tuple[str, str]] = {}
 
         self.var_search = ctk.StringVar(value="")
         self.var_version = ctk.StringVar(value="")
         self.var_release_date = ctk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
 
+        self.txt_updates: Optional[ctk.CTkTextbox] = None
+
         self._build_ui()
         self.refresh_list()
-        self.new_entry()
 
     def _build_ui(self) -> None:
         self.grid_columnconfigure(0, weight=1)
@@ -44,7 +41,7 @@ class ManualeTab(ctk.CTkFrame):
         left.grid_rowconfigure(2, weight=1)
         left.grid_columnconfigure(0, weight=1)
 
-        ctk.CTkLabel(left, text="Manuale versioni", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(left, text="Manuale versioni", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -76,16 +73,26 @@ class ManualeTab(ctk.CTkFrame):
             self.tree.column(c, width=w, anchor=a, stretch=s)
         self.tree.grid(row=0, column=0, sticky="nsew")
         sb = ttk.Scrollbar(lf, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
+        self._pager = TreeviewPager(self.tree, sb)
         sb.grid(row=0, column=1, sticky="ns")
-        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<<TreeviewSelect>>", debounced(self, 60, self._on_select))
         make_treeview_sortable(self.tree)
 
-        right = ctk.CTkFrame(outer)
+        # Il pannello di dettaglio viene costruito alla prima visualizzazione (o selezione).
+        self._detail = ctk.CTkFrame(outer)
+        self._detail.bind("<Map>", lambda _e: self._ensure_detail(), add="+")
+
+        outer.add(left, weight=2)
+        outer.add(self._detail, weight=3)
+
+    def _ensure_detail(self) -> None:
+        if self.txt_updates is not None:
+            return
+        right = self._detail
         right.grid_columnconfigure(0, weight=1)
         right.grid_rowconfigure(2, weight=1)
 
-        ctk.CTkLabel(right, text="Dettaglio versione", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(right, text="Dettaglio versione", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -100,7 +107,7 @@ class ManualeTab(ctk.CTkFrame):
         ctk.CTkLabel(form, text="DATA RILASCIO (YYYY-MM-DD)").grid(row=0, column=1, sticky="w", padx=6, pady=(6, 2))
         ctk.CTkEntry(form, textvariable=self.var_release_date).grid(row=1, column=1, sticky="ew", padx=6, pady=(0, 6))
 
-        ctk.CTkLabel(right, text="Aggiornamenti", font=ctk.CTkFont(size=14, weight="bold")).grid(
+        ctk.CTkLabel(right, text="Aggiornamenti", font=get_font(14, "bold")).grid(
             row=2, column=0, sticky="w", padx=8, pady=(0, 4)
         )
         self.txt_updates = ctk.CTkTextbox(right, wrap="word")
@@ -109,39 +116,53 @@ class ManualeTab(ctk.CTkFrame):
         btns = ctk.CTkFrame(right, fg_color="transparent")
         btns.grid(row=4, column=0, sticky="e", padx=8, pady=(0, 8))
         ctk.CTkButton(btns, text="Nuovo", width=90, command=self.new_entry).pack(side="left", padx=4)
-        ctk.CTkButton(btns, text="Salva", width=90, command=self.save_entry).pack(side="left", padx=4)
-        ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete_entry).pack(side="left", padx=4)
-
-        outer.add(left, weight=2)
-        outer.add(right, weight=3)
+        btn_save = ctk.CTkButton(btns, text="Salva", width=90, command=self.save_entry)
+        btn_save.pack(side="left", padx=4)
+        btn_delete = ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete_entry)
+        btn_delete.pack(side="left", padx=4)
+        # Creati dopo _apply_read_only_ui: la disabilitazione va ripetuta qui.
+        if self.db.is_read_only:
+            btn_save.configure(state="disabled")
+            btn_delete.configure(state="disabled")
 
     def refresh_list(self) -> None:
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
         rows = self.db.fetch_manual_versions(self.var_search.get())
         self._rows_by_iid = {}
+        tree_rows = []
         for r in rows:
-            iid = str(r["id"])
+            iid = str(r.id)
             self._rows_by_iid[iid] = r
-            updates_full = _row_str(r, "updates").replace("\n", " ").strip()
-            updates_preview = updates_full[:140] + ("..." if len(updates_full) > 140 else "")
-            self.tree.insert(
-                "",
-                "end",
-                iid=iid,
-                values=(
-                    _row_str(r, "version"),
-                    _row_str(r, "release_date"),
-                    _row_str(r, "updated_at"),
-                    updates_preview,
-                ),
+            updates_preview = self._updates_preview(iid, r)
+            tree_rows.append(
+                (
+                    iid,
+                    (
+                        r.version,
+                        r.release_date,
+                        r.updated_at,
+                        updates_preview,
+                    ),
+                )
             )
+        self._pager.set_rows(tree_rows)
+
+    def _updates_preview(self, iid: str, r: ManualVersion) -> str:
+        # updated_at fa da timbro di modifica: l'anteprima si ricalcola solo se la riga cambia.
+        stamp = r.updated_at
+        cached = self._preview_cache.get(iid)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        updates_full = r.updates.replace("\n", " ").strip()
+        preview = updates_full[:140] + ("..." if len(updates_full) > 140 else "")
+        self._preview_cache[iid] = (stamp, preview)
+        return preview
 
     def new_entry(self) -> None:
         self.entry_id = None
         self.var_version.set("")
         self.var_release_date.set(datetime.now().strftime("%Y-%m-%d"))
-        self.txt_updates.delete("1.0", "end")
+        if self.txt_updates is not None:
+            self.txt_updates.delete("1.0", "end")
 
     def _on_select(self, _evt=None) -> None:
         sel = self.tree.selection()
@@ -151,18 +172,21 @@ class ManualeTab(ctk.CTkFrame):
         row = self._rows_by_iid.get(iid)
         if not row:
             return
-        full = self.db.read_manual_version(int(row["id"]))
-        self.entry_id = int(full["id"])
-        self.var_version.set(_row_str(full, "version"))
-        self.var_release_date.set(_row_str(full, "release_date"))
-        self.txt_updates.delete("1.0", "end")
-        self.txt_updates.insert("1.0", _row_str(full, "updates"))
+        self._ensure_detail()
+        # fetch_manual_versions restituisce gia il testo completo: nessuna rilettura dal DB.
+        self.entry_id = row.id
+        self.var_version.set(row.version)
+        self.var_release_date.set(row.release_date)
+        updates = row.updates
+        if self.txt_updates.get("1.0", "end-1c") != updates:
+            self.txt_updates.delete("1.0", "end")
+            self.txt_updates.insert("1.0", updates)
 
     def _select_item_row_if_present(self, entry_id: Optional[int]) -> None:
         if entry_id is None:
             return
         iid = str(entry_id)
-        if self.tree.exists(iid):
+        if self._pager.reveal(iid):
             self.tree.selection_set(iid)
             self.tree.focus(iid)
             self.tree.see(iid)
@@ -170,7 +194,7 @@ class ManualeTab(ctk.CTkFrame):
     def save_entry(self) -> None:
         version = (self.var_version.get() or "").strip()
         release_date = (self.var_release_date.get() or "").strip()
-        updates = (self.txt_updates.get("1.0", "end") or "").strip()
+        updates = (self.txt_updates.get("1.0", "end-1c") or "").strip()
         if not version:
             messagebox.showwarning("Manuale", "Compila VERSIONE.")
             return
@@ -178,7 +202,9 @@ class ManualeTab(ctk.CTkFrame):
             messagebox.showwarning("Manuale", "Compila DATA RILASCIO.")
             return
         try:
-            datetime.strptime(release_date, "%Y-%m-%d")
+            if not _DATE_RE.fullmatch(release_date):
+                raise ValueError(release_date)
+            date.fromisoformat(release_date)
         except ValueError:
             messagebox.showwarning("Manuale", "Formato data non valido. Usa YYYY-MM-DD.")
             return
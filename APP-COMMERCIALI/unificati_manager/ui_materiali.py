@@ -1,33 +1,75 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import customtkinter as ctk
 from tkinter import ttk, messagebox
 
 from .services import AppService
-from .ui_utils import bind_uppercase, make_treeview_sortable
+from .ui_utils import (
+    TreeviewPager,
+    clear_treeview,
+    debounced,
+    get_font,
+    insert_rows,
+    make_treeview_sortable,
+    run_in_background,
+    set_option_values,
+    sync_treeview,
+    uppercase_on_commit,
+    uppercase_vars,
+)
 from .utils import normalize_upper
 
 
 def _row_str(r: Any, key: str, default: str = "") -> str:
     try:
         v = r[key]
-    except Exception:
+    except (IndexError, KeyError, TypeError):
+        # Colonna assente (sqlite3.Row/dict) o oggetto senza __getitem__.
         v = getattr(r, key, default)
     return "" if v is None else str(v)
 
 
+def _parse_int(txt: str, default: int = 0) -> int:
+    """Intero da testo utente; `default` se non valido (senza passare da un'eccezione)."""
+    txt = (txt or "").strip()
+    digits = txt[1:] if txt[:1] in ("+", "-") else txt
+    return int(txt) if digits.isdecimal() else default
+
+
+def _str_values(values: Iterable[Any]) -> tuple:
+    """Valori di una riga come stringhe (None -> "") in un'unica passata."""
+    return tuple(["" if v is None else str(v) for v in values])
+
+
+# Colonne del Treeview lette con un solo itemgetter per riga invece di N chiamate a _row_str.
+_PROP_VALUES = itemgetter("name", "unit", "value", "min_value", "max_value", "sort_order")
+_SEMIS_VALUES = itemgetter("type_desc", "state_desc", "description", "dimensions", "updated_at")
+_DESC_AGG_VALUES = itemgetter("description", "updated_at")
+_SEMI_DIM_VALUES = itemgetter("pref_label", "dimension", "weight_per_m")
+_SEMI_ITEM_VALUES = itemgetter("pref_label", "type_desc", "state_desc", "mat_label", "description", "dim_display", "updated_at")
+
+
 class MaterialPropertyBox(ctk.CTkFrame):
     """Gestione proprietà parametriche (CHEM/PHYS/MECH), senza legame a stati."""
 
-    def __init__(self, master, db: AppService, group_code: str, title: str):
+    def __init__(self, master, db: AppService, group_code: str, title: str, on_changed=None):
         super().__init__(master)
         self.db = db
         self.group_code = normalize_upper(group_code)
         self.title = title
+        # on_changed(material_id, group_code, rows) dopo salvataggio/eliminazione di una proprieta.
+        self.on_changed = on_changed
         self.material_id: Optional[int] = None
         self.prop_id: Optional[int] = None
+        # Note per id proprieta (non sono colonne del Treeview).
+        self._notes_by_id: Dict[int, str] = {}
+        self._rows: List[Any] = []
+        self._name_locked = False
 
         self.var_name = ctk.StringVar()
         self.var_unit = ctk.StringVar()
@@ -37,14 +79,22 @@ class MaterialPropertyBox(ctk.CTkFrame):
         self.var_ord = ctk.StringVar(value="0")
         self.var_notes = ctk.StringVar()
 
-        for v in [self.var_name, self.var_unit, self.var_value, self.var_min, self.var_max, self.var_notes]:
-            bind_uppercase(v)
-
         self._build_ui()
+        # MAIUSCOLO alla conferma del campo e al salvataggio, non a ogni tasto.
+        self._upper_fields = (
+            (self.ent_name, self.var_name),
+            (self.ent_unit, self.var_unit),
+            (self.ent_value, self.var_value),
+            (self.ent_min, self.var_min),
+            (self.ent_max, self.var_max),
+            (self.ent_notes, self.var_notes),
+        )
+        for ent, var in self._upper_fields:
+            uppercase_on_commit(ent, var)
 
     def _build_ui(self):
         self.grid_columnconfigure(0, weight=1)
-        lbl = ctk.CTkLabel(self, text=self.title, font=ctk.CTkFont(size=14, weight="bold"))
+        lbl = ctk.CTkLabel(self, text=self.title, font=get_font(14, "bold"))
         lbl.grid(row=0, column=0, sticky="w", padx=8, pady=(8, 4))
 
         # Tree
@@ -61,10 +111,12 @@ class MaterialPropertyBox(ctk.CTkFrame):
         make_treeview_sortable(self.tree, numeric_cols=["ORD"])
         self.tree.grid(row=0, column=0, sticky="nsew")
         sb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
         sb.grid(row=0, column=1, sticky="ns")
+        # Solo le righe visibili (a pagine) diventano item Tk: il resto si carica scorrendo.
+        self._pager = TreeviewPager(self.tree, sb, page_size=100)
 
-        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        # Le frecce tenute premute generano una raffica di selezioni: si applica solo l'ultima.
+        self.tree.bind("<<TreeviewSelect>>", debounced(self, 60, self._on_select))
 
         # Form
         form = ctk.CTkFrame(self)
@@ -106,8 +158,14 @@ class MaterialPropertyBox(ctk.CTkFrame):
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=2, column=0, columnspan=7, sticky="e", padx=6, pady=(0, 6))
         ctk.CTkButton(btns, text="Nuovo", width=90, command=self.new_prop).pack(side="left", padx=4)
-        ctk.CTkButton(btns, text="Salva", width=90, command=self.save_prop).pack(side="left", padx=4)
-        ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete_prop).pack(side="left", padx=4)
+        btn_save = ctk.CTkButton(btns, text="Salva", width=90, command=self.save_prop)
+        btn_save.pack(side="left", padx=4)
+        btn_delete = ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete_prop)
+        btn_delete.pack(side="left", padx=4)
+        # Le box possono nascere dopo _apply_read_only_ui (tab costruite al primo accesso).
+        if self.db.is_read_only:
+            btn_save.configure(state="disabled")
+            btn_delete.configure(state="disabled")
 
     def set_states(self, states: List[Tuple[int, str, str]]) -> None:
         # Proprieta materiale senza legame a stati: no-op.
@@ -118,37 +176,36 @@ class MaterialPropertyBox(ctk.CTkFrame):
         self.new_prop()
         self.refresh()
 
+    def set_rows(self, material_id: Optional[int], rows: List[Any]) -> None:
+        """Come set_material, ma con righe gia lette (fetch_material_bundle)."""
+        self.material_id = material_id
+        self.new_prop()
+        self._apply_rows(rows if material_id else [])
+
     def refresh(self) -> None:
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        if not self.material_id:
-            return
-        rows = self.db.fetch_material_properties(self.material_id, self.group_code)
-        for r in rows:
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(r["id"]),
-                values=(
-                    _row_str(r, "name"),
-                    _row_str(r, "unit"),
-                    _row_str(r, "value"),
-                    _row_str(r, "min_value"),
-                    _row_str(r, "max_value"),
-                    _row_str(r, "sort_order"),
-                ),
-            )
+        rows = self.db.fetch_material_properties(self.material_id, self.group_code) if self.material_id else []
+        self._apply_rows(rows)
+
+    def _apply_rows(self, rows: List[Any]) -> None:
+        self._rows = rows
+        self._notes_by_id = {r["id"]: r["notes"] or "" for r in rows}
+        self._pager.set_rows([(str(r["id"]), _str_values(_PROP_VALUES(r))) for r in rows])
+
+    _EMPTY_FORM = ("", "", "", "", "", "0", "")
+
+    def _set_form(self, values: Tuple[str, ...], name_locked: bool) -> None:
+        # Scrive solo i campi che cambiano: set_material su un form gia vuoto non tocca Tk.
+        form_vars = (self.var_name, self.var_unit, self.var_value, self.var_min, self.var_max, self.var_ord, self.var_notes)
+        for var, v in zip(form_vars, values):
+            if var.get() != v:
+                var.set(v)
+        if name_locked != self._name_locked:
+            self.ent_name.configure(state="disabled" if name_locked else "normal")
+            self._name_locked = name_locked
 
     def new_prop(self) -> None:
         self.prop_id = None
-        self.var_name.set("")
-        self.var_unit.set("")
-        self.var_value.set("")
-        self.var_min.set("")
-        self.var_max.set("")
-        self.var_ord.set("0")
-        self.var_notes.set("")
-        self.ent_name.configure(state="normal")
+        self._set_form(self._EMPTY_FORM, name_locked=False)
 
     def _on_select(self, _evt=None):
         sel = self.tree.selection()
@@ -159,33 +216,24 @@ class MaterialPropertyBox(ctk.CTkFrame):
         vals = self.tree.item(iid, "values")
         if not vals:
             return
-        name, unit, value, vmin, vmax, ordv = vals
-        self.var_name.set(name)
-        self.var_unit.set(unit)
-        self.var_value.set(value)
-        self.var_min.set(vmin)
-        self.var_max.set(vmax)
-        self.var_ord.set(ordv)
-        # note is not in columns -> reload via service method
-        try:
-            self.var_notes.set(self.db.read_material_property_notes(self.prop_id))
-        except Exception:
-            self.var_notes.set("")
-        self.ent_name.configure(state="disabled")
+        # note is not in columns -> read from the rows loaded by refresh
+        self._set_form(tuple(map(str, vals)) + (self._notes_by_id.get(self.prop_id, ""),), name_locked=True)
+
+    def _notify_changed(self) -> None:
+        if callable(self.on_changed):
+            self.on_changed(self.material_id, self.group_code, self._rows)
 
     def save_prop(self) -> None:
         if not self.material_id:
             messagebox.showwarning("Materiali", "Seleziona prima un materiale.")
             return
+        uppercase_vars(var for _, var in self._upper_fields)
         name = (self.var_name.get() or "").strip()
         if not name:
             messagebox.showwarning("Proprietà", "Inserisci un NOME proprietà.")
             return
         state_code = ""
-        try:
-            ordv = int((self.var_ord.get() or "0").strip() or "0")
-        except Exception:
-            ordv = 0
+        ordv = _parse_int(self.var_ord.get())
 
         try:
             if self.prop_id is None:
@@ -213,6 +261,7 @@ class MaterialPropertyBox(ctk.CTkFrame):
                     ordv,
                 )
             self.refresh()
+            self._notify_changed()
             messagebox.showinfo("Proprietà", "Salvato.")
         except Exception as e:
             messagebox.showerror("Proprietà", f"Errore salvataggio: {e}")
@@ -226,6 +275,7 @@ class MaterialPropertyBox(ctk.CTkFrame):
             self.db.delete_material_property(self.prop_id)
             self.new_prop()
             self.refresh()
+            self._notify_changed()
         except Exception as e:
             messagebox.showerror("Proprietà", f"Errore eliminazione: {e}")
 
@@ -238,7 +288,7 @@ class LinkedSemisBox(ctk.CTkFrame):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
-        ctk.CTkLabel(self, text="Semilavorati collegati", font=ctk.CTkFont(size=14, weight="bold")).grid(
+        ctk.CTkLabel(self, text="Semilavorati collegati", font=get_font(14, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -255,35 +305,31 @@ class LinkedSemisBox(ctk.CTkFrame):
         make_treeview_sortable(self.tree)
         self.tree.grid(row=0, column=0, sticky="nsew")
         sb = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
         sb.grid(row=0, column=1, sticky="ns")
+        self._pager = TreeviewPager(self.tree, sb, page_size=100)
 
     def set_material(self, material_id: Optional[int]) -> None:
         self.material_id = material_id
         self.refresh()
 
+    def set_rows(self, material_id: Optional[int], rows: List[Any]) -> None:
+        self.material_id = material_id
+        self._apply_rows(rows if material_id else [])
+
     def refresh(self) -> None:
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        if not self.material_id:
-            return
-        rows = self.db.fetch_semis_by_material(self.material_id)
-        for r in rows:
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(r["id"]),
-                values=(
-                    _row_str(r, "type_desc"),
-                    _row_str(r, "state_desc"),
-                    _row_str(r, "description"),
-                    _row_str(r, "dimensions"),
-                    _row_str(r, "updated_at"),
-                ),
-            )
+        self._apply_rows(self.db.fetch_semis_by_material(self.material_id) if self.material_id else [])
+
+    def _apply_rows(self, rows: List[Any]) -> None:
+        self._pager.set_rows([(str(r["id"]), _str_values(_SEMIS_VALUES(r))) for r in rows])
 
 
 class MaterialTaxonomyDialog(ctk.CTkToplevel):
+    SUB_CACHE_SIZE = 32
+    # Argomento di on_changed: solo le voci di famiglie/sottofamiglie (creazione, eliminazione di voci
+    # non usate) oppure anche i materiali, che memorizzano le descrizioni e seguono le rinomine.
+    CHANGED_LABELS = "labels"
+    CHANGED_MEMBERSHIP = "membership"
+
     def __init__(self, master, db: AppService, on_changed=None):
         super().__init__(master)
         self.db = db
@@ -291,13 +337,18 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
 
         self.family_id: Optional[int] = None
         self.subfamily_id: Optional[int] = None
-        self._family_rows: List[Any] = []
-        self._sub_rows: List[Any] = []
+        # id -> descrizione, nell'ordine del DB: unico archivio delle righe (niente sqlite3.Row trattenute).
+        self._family_desc_index: Dict[int, str] = {}
+        self._sub_desc_index: Dict[int, str] = {}
+        # Sottofamiglie delle famiglie visitate di recente (LRU): tornare su una famiglia non rilegge il DB.
+        # Per famiglia: indice id -> descrizione e righe (iid, values) gia pronte per il Treeview.
+        self._sub_cache: "OrderedDict[int, Tuple[Dict[int, str], List[Tuple[str, tuple]]]]" = OrderedDict()
+        # Snapshot delle righe mostrate: i refresh toccano solo le differenze.
+        self._fam_shown: Dict[str, tuple] = {}
+        self._sub_shown: Dict[str, tuple] = {}
 
         self.var_family = ctk.StringVar()
         self.var_subfamily = ctk.StringVar()
-        bind_uppercase(self.var_family)
-        bind_uppercase(self.var_subfamily)
 
         self.title("Gestione Famiglie Materiali")
         self.geometry("980x560")
@@ -314,12 +365,20 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
             self.grab_release()
         except Exception:
             pass
-        self.destroy()
+        # Nascosto e non distrutto: MaterialsTab lo riapre senza ricostruire i widget.
+        self.withdraw()
 
-    def _notify_changed(self):
+    def reopen(self):
+        self.refresh_all()
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self.focus_set()
+
+    def _notify_changed(self, kind: str = CHANGED_LABELS):
         if callable(self.on_changed):
             try:
-                self.on_changed()
+                self.on_changed(kind)
             except Exception:
                 pass
 
@@ -333,7 +392,7 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
         left.grid_columnconfigure(0, weight=1)
         left.grid_rowconfigure(1, weight=1)
 
-        ctk.CTkLabel(left, text="Famiglie", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(left, text="Famiglie", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -350,13 +409,15 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
         sb_f = ttk.Scrollbar(lf, orient="vertical", command=self.tree_fam.yview)
         self.tree_fam.configure(yscrollcommand=sb_f.set)
         sb_f.grid(row=0, column=1, sticky="ns")
-        self.tree_fam.bind("<<TreeviewSelect>>", self._on_select_family)
+        self.tree_fam.bind("<<TreeviewSelect>>", debounced(self, 60, self._on_select_family))
 
         ff = ctk.CTkFrame(left)
         ff.grid(row=2, column=0, sticky="ew", padx=8, pady=(0, 8))
         ff.grid_columnconfigure(0, weight=1)
         ctk.CTkLabel(ff, text="Descrizione famiglia").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 2))
-        ctk.CTkEntry(ff, textvariable=self.var_family).grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        ent_family = ctk.CTkEntry(ff, textvariable=self.var_family)
+        ent_family.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_family, self.var_family)
         fbtn = ctk.CTkFrame(ff, fg_color="transparent")
         fbtn.grid(row=2, column=0, sticky="e", padx=6, pady=(0, 6))
         ctk.CTkButton(fbtn, text="Nuovo", width=90, command=self.new_family).pack(side="left", padx=4)
@@ -368,7 +429,7 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
         right.grid_columnconfigure(0, weight=1)
         right.grid_rowconfigure(1, weight=1)
 
-        self.lbl_sub_title = ctk.CTkLabel(right, text="Sottofamiglie", font=ctk.CTkFont(size=16, weight="bold"))
+        self.lbl_sub_title = ctk.CTkLabel(right, text="Sottofamiglie", font=get_font(16, "bold"))
         self.lbl_sub_title.grid(row=0, column=0, sticky="w", padx=8, pady=(8, 4))
 
         rf = ctk.CTkFrame(right)
@@ -384,13 +445,15 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
         sb_s = ttk.Scrollbar(rf, orient="vertical", command=self.tree_sub.yview)
         self.tree_sub.configure(yscrollcommand=sb_s.set)
         sb_s.grid(row=0, column=1, sticky="ns")
-        self.tree_sub.bind("<<TreeviewSelect>>", self._on_select_subfamily)
+        self.tree_sub.bind("<<TreeviewSelect>>", debounced(self, 60, self._on_select_subfamily))
 
         sf = ctk.CTkFrame(right)
         sf.grid(row=2, column=0, sticky="ew", padx=8, pady=(0, 8))
         sf.grid_columnconfigure(0, weight=1)
         ctk.CTkLabel(sf, text="Descrizione sottofamiglia").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 2))
-        ctk.CTkEntry(sf, textvariable=self.var_subfamily).grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        ent_subfamily = ctk.CTkEntry(sf, textvariable=self.var_subfamily)
+        ent_subfamily.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_subfamily, self.var_subfamily)
         sbtn = ctk.CTkFrame(sf, fg_color="transparent")
         sbtn.grid(row=2, column=0, sticky="e", padx=6, pady=(0, 6))
         ctk.CTkButton(sbtn, text="Nuovo", width=90, command=self.new_subfamily).pack(side="left", padx=4)
@@ -398,19 +461,18 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
         ctk.CTkButton(sbtn, text="Elimina", width=90, command=self.delete_subfamily).pack(side="left", padx=4)
 
     def refresh_all(self, preserve_family_id: Optional[int] = None, preserve_subfamily_id: Optional[int] = None):
-        self._family_rows = list(self.db.fetch_material_families())
+        self._sub_cache.clear()
+        self._family_desc_index = {int(r["id"]): _row_str(r, "description") for r in self.db.fetch_material_families()}
 
-        for k in self.tree_fam.get_children(""):
-            self.tree_fam.delete(k)
-        for r in self._family_rows:
-            self.tree_fam.insert("", "end", iid=str(r["id"]), values=(_row_str(r, "description"),))
+        self._fam_shown = sync_treeview(
+            self.tree_fam, [(str(i), (d,)) for i, d in self._family_desc_index.items()], self._fam_shown
+        )
 
         selected_family_id = preserve_family_id
         if selected_family_id is None:
             selected_family_id = self.family_id
-        valid_family_ids = {int(r["id"]) for r in self._family_rows}
-        if selected_family_id not in valid_family_ids:
-            selected_family_id = next(iter(valid_family_ids), None)
+        if selected_family_id not in self._family_desc_index:
+            selected_family_id = next(iter(self._family_desc_index), None)
 
         self.family_id = selected_family_id
         if self.family_id is not None:
@@ -424,26 +486,23 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
 
     def refresh_subfamilies(self, family_id: Optional[int], preserve_subfamily_id: Optional[int] = None):
         old_subfamily_id = self.subfamily_id
-        for k in self.tree_sub.get_children(""):
-            self.tree_sub.delete(k)
         self.subfamily_id = None
         self.var_subfamily.set("")
 
         if family_id is None:
-            self._sub_rows = []
+            self._sub_desc_index = {}
+            self._sub_shown = sync_treeview(self.tree_sub, [], self._sub_shown)
             self.lbl_sub_title.configure(text="Sottofamiglie")
             return
 
         fam_desc = self._family_desc_by_id(family_id)
         self.lbl_sub_title.configure(text=f"Sottofamiglie - {fam_desc}")
-        self._sub_rows = list(self.db.fetch_material_subfamilies(int(family_id)))
-        for r in self._sub_rows:
-            self.tree_sub.insert("", "end", iid=str(r["id"]), values=(_row_str(r, "description"),))
+        self._sub_desc_index, sub_rows = self._subfamilies_of(int(family_id))
+        self._sub_shown = sync_treeview(self.tree_sub, sub_rows, self._sub_shown)
 
         selected_sub_id = preserve_subfamily_id if preserve_subfamily_id is not None else old_subfamily_id
-        valid_sub_ids = {int(r["id"]) for r in self._sub_rows}
-        if selected_sub_id not in valid_sub_ids:
-            selected_sub_id = next(iter(valid_sub_ids), None)
+        if selected_sub_id not in self._sub_desc_index:
+            selected_sub_id = next(iter(self._sub_desc_index), None)
 
         self.subfamily_id = selected_sub_id
         if self.subfamily_id is not None:
@@ -451,17 +510,22 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
             self.tree_sub.focus(str(self.subfamily_id))
             self.var_subfamily.set(self._subfamily_desc_by_id(self.subfamily_id))
 
+    def _subfamilies_of(self, family_id: int) -> Tuple[Dict[int, str], List[Tuple[str, tuple]]]:
+        subs = self._sub_cache.get(family_id)
+        if subs is None:
+            index = {int(r["id"]): _row_str(r, "description") for r in self.db.fetch_material_subfamilies(family_id)}
+            subs = self._sub_cache[family_id] = (index, [(str(i), (d,)) for i, d in index.items()])
+            if len(self._sub_cache) > self.SUB_CACHE_SIZE:
+                self._sub_cache.popitem(last=False)
+        else:
+            self._sub_cache.move_to_end(family_id)
+        return subs
+
     def _family_desc_by_id(self, family_id: int) -> str:
-        for r in self._family_rows:
-            if int(r["id"]) == int(family_id):
-                return _row_str(r, "description")
-        return ""
+        return self._family_desc_index.get(int(family_id), "")
 
     def _subfamily_desc_by_id(self, subfamily_id: int) -> str:
-        for r in self._sub_rows:
-            if int(r["id"]) == int(subfamily_id):
-                return _row_str(r, "description")
-        return ""
+        return self._sub_desc_index.get(int(subfamily_id), "")
 
     def _on_select_family(self, _evt=None):
         sel = self.tree_fam.selection()
@@ -481,11 +545,11 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
     def new_family(self):
         self.family_id = None
         self.var_family.set("")
-        for k in self.tree_fam.selection():
-            self.tree_fam.selection_remove(k)
+        self.tree_fam.selection_remove(*self.tree_fam.selection())
         self.refresh_subfamilies(None)
 
     def save_family(self):
+        uppercase_vars((self.var_family,))
         desc = (self.var_family.get() or "").strip()
         if not desc:
             messagebox.showwarning("Materiali", "Inserisci la descrizione famiglia.")
@@ -494,10 +558,11 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
             if self.family_id is None:
                 new_id = self.db.create_material_family(desc)
                 self.refresh_all(preserve_family_id=new_id)
+                self._notify_changed()
             else:
                 self.db.update_material_family(self.family_id, desc)
                 self.refresh_all(preserve_family_id=self.family_id)
-            self._notify_changed()
+                self._notify_changed(self.CHANGED_MEMBERSHIP)
         except Exception as e:
             messagebox.showerror("Materiali", f"Errore salvataggio famiglia: {e}")
 
@@ -516,25 +581,27 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
     def new_subfamily(self):
         self.subfamily_id = None
         self.var_subfamily.set("")
-        for k in self.tree_sub.selection():
-            self.tree_sub.selection_remove(k)
+        self.tree_sub.selection_remove(*self.tree_sub.selection())
 
     def save_subfamily(self):
         if self.family_id is None:
             messagebox.showwarning("Materiali", "Seleziona prima una famiglia.")
             return
+        uppercase_vars((self.var_subfamily,))
         desc = (self.var_subfamily.get() or "").strip()
         if not desc:
             messagebox.showwarning("Materiali", "Inserisci la descrizione sottofamiglia.")
             return
+        self._sub_cache.pop(self.family_id, None)
         try:
             if self.subfamily_id is None:
                 new_id = self.db.create_material_subfamily(self.family_id, desc)
                 self.refresh_subfamilies(self.family_id, preserve_subfamily_id=new_id)
+                self._notify_changed()
             else:
                 self.db.update_material_subfamily(self.subfamily_id, desc)
                 self.refresh_subfamilies(self.family_id, preserve_subfamily_id=self.subfamily_id)
-            self._notify_changed()
+                self._notify_changed(self.CHANGED_MEMBERSHIP)
         except Exception as e:
             messagebox.showerror("Materiali", f"Errore salvataggio sottofamiglia: {e}")
 
@@ -543,6 +610,7 @@ class MaterialTaxonomyDialog(ctk.CTkToplevel):
             return
         if not messagebox.askyesno("Materiali", "Eliminare la sottofamiglia selezionata?"):
             return
+        self._sub_cache.pop(self.family_id, None)
         try:
             self.db.delete_material_subfamily(self.subfamily_id)
             self.refresh_subfamilies(self.family_id)
@@ -559,6 +627,7 @@ class MaterialDetailsDialog(ctk.CTkToplevel):
         self.db = db
         self.on_close = on_close
         self.material_id: Optional[int] = None
+        self._apply_job = None
 
         self.title("Materiale - Proprieta e collegamenti")
         self.geometry("1200x760")
@@ -586,6 +655,9 @@ class MaterialDetailsDialog(ctk.CTkToplevel):
         paned.add(self.box_link, weight=1)
 
     def _close(self):
+        if self._apply_job is not None:
+            self.after_cancel(self._apply_job)
+            self._apply_job = None
         if callable(self.on_close):
             try:
                 self.on_close()
@@ -599,15 +671,32 @@ class MaterialDetailsDialog(ctk.CTkToplevel):
         self.box_mech.set_states(states)
 
     def set_material(self, material_id: Optional[int]):
+        # Le quattro box si aggiornano insieme a idle: piu chiamate ravvicinate -> un solo aggiornamento e layout.
         self.material_id = material_id
-        self.box_chem.set_material(material_id)
-        self.box_phys.set_material(material_id)
-        self.box_mech.set_material(material_id)
-        self.box_link.set_material(material_id)
+        if self._apply_job is None:
+            self._apply_job = self.after_idle(self._apply_material)
+
+    def _apply_material(self):
+        self._apply_job = None
+        material_id = self.material_id
+        # Un'unica lettura per i tre gruppi di proprieta e i semilavorati collegati.
+        bundle = self.db.fetch_material_bundle(material_id) if material_id else {}
+        self.box_chem.set_rows(material_id, bundle.get("CHEM", []))
+        self.box_phys.set_rows(material_id, bundle.get("PHYS", []))
+        self.box_mech.set_rows(material_id, bundle.get("MECH", []))
+        self.box_link.set_rows(material_id, bundle.get("semis", []))
 
 
 class MaterialsTab(ctk.CTkFrame):
     EMPTY_CHOICE = "-"
+    # tab -> (gruppo, titolo box)
+    PROPERTY_TABS = {
+        "Chimiche": ("CHEM", "Proprieta chimiche"),
+        "Fisiche": ("PHYS", "Proprieta fisiche"),
+        "Meccaniche": ("MECH", "Proprieta meccaniche"),
+    }
+    # Gruppi riassunti nelle colonne CHIMICHE / FISICHE / MECCANICHE (a partire dalla colonna 2).
+    SUMMARY_GROUPS = ("CHEM", "PHYS", "MECH")
 
     def __init__(self, master, db: AppService):
         super().__init__(master)
@@ -615,8 +704,20 @@ class MaterialsTab(ctk.CTkFrame):
 
         self.material_id: Optional[int] = None
         self._taxonomy_dialog: Optional[MaterialTaxonomyDialog] = None
-        self._families: List[Tuple[int, str]] = []
-        self._subfamilies: List[Tuple[int, str]] = []
+        # descrizione -> id (ordine del DB) e valori gia pronti per i menu.
+        self._families: Dict[str, int] = {}
+        self._family_values: List[str] = [self.EMPTY_CHOICE]
+        self._subfamilies: Dict[str, int] = {}
+        self._subfamily_values: List[str] = [self.EMPTY_CHOICE]
+        # (descrizione -> id, valori menu) per family_id, validi fino al prossimo ricaricamento delle famiglie.
+        self._subfamily_cache: Dict[int, Tuple[Dict[str, int], List[str]]] = {}
+        # Box proprieta per gruppo, create alla prima apertura della rispettiva tab.
+        self._boxes: Dict[str, MaterialPropertyBox] = {}
+        # Riassunti proprieta gia formattati: material_id -> gruppo -> testo della colonna.
+        self._prop_cache: Dict[int, Dict[str, str]] = {}
+        self._last_search: Optional[str] = None
+        # Lettura elenco in corso sul thread di background (una nuova ricerca annulla quella in coda).
+        self._list_future: Optional[Future] = None
 
         self.var_search = ctk.StringVar()
         self.var_family = ctk.StringVar(value=self.EMPTY_CHOICE)
@@ -624,12 +725,12 @@ class MaterialsTab(ctk.CTkFrame):
         self.var_std = ctk.StringVar()
         self.var_notes = ctk.StringVar()
 
-        for v in [self.var_std, self.var_notes]:
-            bind_uppercase(v)
         self._build_ui()
         self.refresh_lists()
         self.refresh_materials()
         self.new_material()
+        # Ricerca durante la digitazione: una sola query quando l'utente si ferma.
+        self.var_search.trace_add("write", debounced(self, 250, self._on_search_changed))
 
     def _build_ui(self):
         self.grid_columnconfigure(0, weight=1)
@@ -643,7 +744,7 @@ class MaterialsTab(ctk.CTkFrame):
         left.grid_rowconfigure(2, weight=1)
         left.grid_columnconfigure(0, weight=1)
 
-        ctk.CTkLabel(left, text="Materiali", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(left, text="Materiali", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -676,16 +777,17 @@ class MaterialsTab(ctk.CTkFrame):
         make_treeview_sortable(self.tree)
         self.tree.grid(row=0, column=0, sticky="nsew")
         sb = ttk.Scrollbar(lf, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
         sb.grid(row=0, column=1, sticky="ns")
-        self.tree.bind("<<TreeviewSelect>>", self._on_select_material)
+        # Elenco a pagine: le righe oltre la prima pagina diventano item Tk solo scorrendo.
+        self._pager = TreeviewPager(self.tree, sb)
+        self.tree.bind("<<TreeviewSelect>>", debounced(self, 60, self._on_select_material))
 
         # Right detail
         right = ctk.CTkFrame(outer)
         right.grid_rowconfigure(2, weight=1)
         right.grid_columnconfigure(0, weight=1)
 
-        ctk.CTkLabel(right, text="Dettaglio", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(right, text="Dettaglio", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -711,10 +813,14 @@ class MaterialsTab(ctk.CTkFrame):
         self.opt_desc.grid(row=1, column=1, sticky="ew", padx=6, pady=(0, 6))
 
         lab("NORMA", 0, 2)
-        ctk.CTkEntry(form, textvariable=self.var_std).grid(row=1, column=2, sticky="ew", padx=6, pady=(0, 6))
+        ent_std = ctk.CTkEntry(form, textvariable=self.var_std)
+        ent_std.grid(row=1, column=2, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_std, self.var_std)
 
         lab("NOTE", 2, 0)
-        ctk.CTkEntry(form, textvariable=self.var_notes).grid(row=3, column=0, columnspan=3, sticky="ew", padx=6, pady=(0, 6))
+        ent_notes = ctk.CTkEntry(form, textvariable=self.var_notes)
+        ent_notes.grid(row=3, column=0, columnspan=3, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_notes, self.var_notes)
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=4, column=0, columnspan=3, sticky="e", padx=6, pady=(0, 6))
@@ -722,18 +828,11 @@ class MaterialsTab(ctk.CTkFrame):
         ctk.CTkButton(btns, text="Salva", width=90, command=self.save_material).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete_material).pack(side="left", padx=4)
 
-        props = ctk.CTkTabview(right)
-        props.grid(row=2, column=0, sticky="nsew", padx=8, pady=(0, 8))
-        tab_chem = props.add("Chimiche")
-        tab_phys = props.add("Fisiche")
-        tab_mech = props.add("Meccaniche")
-
-        self.box_chem = MaterialPropertyBox(tab_chem, self.db, "CHEM", "Proprieta chimiche")
-        self.box_chem.pack(fill="both", expand=True)
-        self.box_phys = MaterialPropertyBox(tab_phys, self.db, "PHYS", "Proprieta fisiche")
-        self.box_phys.pack(fill="both", expand=True)
-        self.box_mech = MaterialPropertyBox(tab_mech, self.db, "MECH", "Proprieta meccaniche")
-        self.box_mech.pack(fill="both", expand=True)
+        self.props = ctk.CTkTabview(right, command=self._on_props_tab)
+        self.props.grid(row=2, column=0, sticky="nsew", padx=8, pady=(0, 8))
+        for tab_name in self.PROPERTY_TABS:
+            self.props.add(tab_name)
+        self._ensure_property_box(self.props.get())
 
         outer.add(left, weight=2)
         outer.add(right, weight=3)
@@ -741,43 +840,52 @@ class MaterialsTab(ctk.CTkFrame):
     def _open_taxonomy_dialog(self):
         try:
             if self._taxonomy_dialog is not None and self._taxonomy_dialog.winfo_exists():
-                self._taxonomy_dialog.focus_set()
+                if self._taxonomy_dialog.winfo_viewable():
+                    self._taxonomy_dialog.focus_set()
+                else:
+                    self._taxonomy_dialog.reopen()
                 return
         except Exception:
             self._taxonomy_dialog = None
         self._taxonomy_dialog = MaterialTaxonomyDialog(self, self.db, on_changed=self._on_taxonomy_changed)
         self._taxonomy_dialog.focus_set()
 
-    def _on_taxonomy_changed(self):
+    def _on_taxonomy_changed(self, kind: str = MaterialTaxonomyDialog.CHANGED_MEMBERSHIP):
+        if kind == MaterialTaxonomyDialog.CHANGED_LABELS:
+            self._on_taxonomy_labels_changed()
+            return
+        # Rinomina: cambiano anche FAMIGLIA/SOTTOFAMIGLIA dei materiali in elenco.
         self._refresh_material_taxonomy(self.var_family.get(), self.var_desc.get())
-        self.refresh_materials()
-        self._select_material_row_if_present(self.material_id)
+        mid = self.material_id
+        self.refresh_materials(then=lambda: self._select_material_row_if_present(mid))
 
-    def _select_material_row_if_present(self, material_id: Optional[int]):
+    def _on_taxonomy_labels_changed(self):
+        # Voci create o eliminate (solo se non usate): l'elenco materiali non cambia.
+        self._refresh_material_taxonomy(self.var_family.get(), self.var_desc.get())
+
+    def _select_material_row_if_present(self, material_id: Optional[int]) -> bool:
         if material_id is None:
-            return
+            return False
         iid = str(material_id)
-        if self.tree.exists(iid):
-            self.tree.selection_set(iid)
-            self.tree.focus(iid)
-            self._on_select_material()
+        if not self._pager.reveal(iid):
+            return False
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        self._on_select_material()
+        return True
 
     def refresh_lists(self, selected_family: Optional[str] = None, selected_subfamily: Optional[str] = None):
         # Proprieta materiale senza legame con gli stati semilavorato.
         self._refresh_material_taxonomy(selected_family, selected_subfamily)
 
     def _refresh_material_taxonomy(self, selected_family: Optional[str] = None, selected_subfamily: Optional[str] = None):
-        fam_rows = list(self.db.fetch_material_families())
-        self._families = [(int(r["id"]), _row_str(r, "description")) for r in fam_rows]
-
-        family_values = [d for _, d in self._families]
-        if not family_values:
-            family_values = [self.EMPTY_CHOICE]
-        self.opt_family.configure(values=family_values)
+        self._families, self._family_values = self._desc_index(self.db.fetch_material_families())
+        self._subfamily_cache.clear()
+        set_option_values(self.opt_family, self._family_values)
 
         desired_family = (selected_family or self.var_family.get() or "").strip()
-        if desired_family not in family_values:
-            desired_family = family_values[0]
+        if desired_family not in self._families:
+            desired_family = self._family_values[0]
         self.var_family.set(desired_family)
 
         self._refresh_subfamilies_for_family(desired_family, selected_subfamily)
@@ -785,34 +893,54 @@ class MaterialsTab(ctk.CTkFrame):
     def _refresh_subfamilies_for_family(self, family_desc: str, selected_subfamily: Optional[str] = None):
         family_id = self._family_id_from_desc(family_desc)
         if family_id is None:
-            self._subfamilies = []
-            self.opt_desc.configure(values=[self.EMPTY_CHOICE])
+            self._subfamilies, self._subfamily_values = {}, [self.EMPTY_CHOICE]
+            set_option_values(self.opt_desc, self._subfamily_values)
             self.var_desc.set(self.EMPTY_CHOICE)
             return
 
-        sub_rows = list(self.db.fetch_material_subfamilies(family_id))
-        self._subfamilies = [(int(r["id"]), _row_str(r, "description")) for r in sub_rows]
-        sub_values = [d for _, d in self._subfamilies]
-        if not sub_values:
-            sub_values = [self.EMPTY_CHOICE]
-        self.opt_desc.configure(values=sub_values)
+        cached = self._subfamily_cache.get(family_id)
+        if cached is None:
+            cached = self._subfamily_cache[family_id] = self._desc_index(self.db.fetch_material_subfamilies(family_id))
+        self._subfamilies, self._subfamily_values = cached
+        set_option_values(self.opt_desc, self._subfamily_values)
 
         desired_sub = (selected_subfamily or self.var_desc.get() or "").strip()
-        if desired_sub not in sub_values:
-            desired_sub = sub_values[0]
+        if desired_sub not in self._subfamilies:
+            desired_sub = self._subfamily_values[0]
         self.var_desc.set(desired_sub)
 
+    def _desc_index(self, rows: Iterable[Any]) -> Tuple[Dict[str, int], List[str]]:
+        """(descrizione -> id, valori per il menu); a parita di descrizione vale la prima riga."""
+        index: Dict[str, int] = {}
+        for r in rows:
+            index.setdefault(_row_str(r, "description"), int(r["id"]))
+        return index, list(index) or [self.EMPTY_CHOICE]
+
     def _family_id_from_desc(self, desc: str) -> Optional[int]:
-        for fam_id, fam_desc in self._families:
-            if fam_desc == desc:
-                return fam_id
-        return None
+        return self._families.get(desc)
 
     def _on_family_changed(self, value: str):
         self._refresh_subfamilies_for_family(value)
 
-    def _property_summary(self, material_id: int, group_code: str, max_items: int = 3) -> str:
-        rows = self.db.fetch_material_properties(int(material_id), group_code)
+    def _property_summary(self, material_id: int, group_code: str) -> str:
+        return self._prop_cache.get(int(material_id), {}).get(group_code, "")
+
+    def _cache_summaries(self, material_id: int, rows_by_group: Dict[str, List[Any]]) -> Dict[str, str]:
+        fmt = self._format_summary
+        self._prop_cache[material_id] = {g: fmt(rows_by_group.get(g, [])) for g in self.SUMMARY_GROUPS}
+        return self._prop_cache[material_id]
+
+    def _row_values(self, row: Any, summaries: Dict[str, str]) -> tuple:
+        return (
+            _row_str(row, "family"),
+            _row_str(row, "description"),
+            *(summaries[g] for g in self.SUMMARY_GROUPS),
+            _row_str(row, "updated_at"),
+        )
+
+    @staticmethod
+    def _format_summary(rows: List[Any], max_items: int = 3) -> str:
+        # Stesso formato delle colonne chem/phys/mech di search_materials (riga singola dopo un salvataggio).
         parts: List[str] = []
         for r in rows:
             name = _row_str(r, "name").strip()
@@ -830,34 +958,85 @@ class MaterialsTab(ctk.CTkFrame):
             out += " | ..."
         return out
 
-    def refresh_materials(self):
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
+    def _on_search_changed(self):
+        # Spazi in coda o un testo riportato al valore precedente non rilanciano la ricerca.
+        if (self.var_search.get() or "").strip() != self._last_search:
+            self.refresh_materials()
+
+    def refresh_materials(self, then: Optional[Callable[[], Any]] = None):
+        """Rilegge l'elenco in background; `then` viene eseguito dopo l'aggiornamento del Treeview."""
         q = (self.var_search.get() or "").strip()
-        rows = self.db.search_materials(q)
-        for r in rows:
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(r["id"]),
-                values=(
-                    _row_str(r, "family"),
-                    _row_str(r, "description"),
-                    self._property_summary(int(r["id"]), "CHEM"),
-                    self._property_summary(int(r["id"]), "PHYS"),
-                    self._property_summary(int(r["id"]), "MECH"),
-                    _row_str(r, "updated_at"),
-                ),
-            )
+        self._last_search = q
+        if self._list_future is not None:
+            self._list_future.cancel()
+        # Una sola query: i riassunti proprieta arrivano gia composti da SQLite (colonne chem/phys/mech).
+        future = self._list_future = self.db.submit_read("search_materials", q, True)
+
+        def _done(data):
+            if future is not self._list_future:
+                return  # superata da una ricerca piu recente
+            self._list_future = None
+            self._apply_materials(data)
+            if then is not None:
+                then()
+
+        run_in_background(self, future, _done)
+
+    def _apply_materials(self, rows: List[Any]) -> None:
+        self._prop_cache = {r["id"]: {"CHEM": r["chem"], "PHYS": r["phys"], "MECH": r["mech"]} for r in rows}
+        cache = self._prop_cache
+        self._pager.set_rows([(str(r["id"]), self._row_values(r, cache[r["id"]])) for r in rows])
+
+    def _refresh_material_row(self, material_id: int) -> None:
+        """Aggiorna (o inserisce in cima, come piu recente) la sola riga del materiale salvato."""
+        row = self.db.read_material(material_id)
+        bundle = self.db.fetch_material_bundle(material_id, include_semis=False)
+        values = self._row_values(row, self._cache_summaries(material_id, bundle))
+        self._pager.upsert(str(material_id), values, 0)
+
+    def _on_properties_changed(self, material_id: Optional[int], group_code: str, rows: List[Any]) -> None:
+        # Aggiorna solo la colonna riassunto del gruppo modificato, senza rileggere l'elenco.
+        entry = self._prop_cache.get(material_id) if material_id else None
+        if entry is None or group_code not in entry:
+            return
+        summary = self._format_summary(rows)
+        if entry[group_code] == summary:
+            return
+        entry[group_code] = summary
+        iid = str(material_id)
+        values = self._pager.values(iid)
+        if values is not None:
+            values = list(values)
+            values[2 + self.SUMMARY_GROUPS.index(group_code)] = summary
+            self._pager.update(iid, tuple(values))
 
     def new_material(self):
         self.material_id = None
         self.var_std.set("")
         self.var_notes.set("")
         self._refresh_material_taxonomy()
-        self.box_chem.set_material(None)
-        self.box_phys.set_material(None)
-        self.box_mech.set_material(None)
+        self._set_property_boxes(None)
+
+    def _ensure_property_box(self, tab_name: str) -> None:
+        group_code, title = self.PROPERTY_TABS[tab_name]
+        if group_code in self._boxes:
+            return
+        box = MaterialPropertyBox(
+            self.props.tab(tab_name), self.db, group_code, title, on_changed=self._on_properties_changed
+        )
+        box.pack(fill="both", expand=True)
+        self._boxes[group_code] = box
+        if self.material_id is not None:
+            box.set_material(self.material_id)
+
+    def _on_props_tab(self) -> None:
+        self._ensure_property_box(self.props.get())
+
+    def _set_property_boxes(self, material_id: Optional[int]) -> None:
+        # Le tab non ancora aperte caricheranno il materiale corrente alla prima apertura.
+        bundle = self.db.fetch_material_bundle(material_id, include_semis=False) if material_id else {}
+        for group_code, box in self._boxes.items():
+            box.set_rows(material_id, bundle.get(group_code, []))
 
     def _on_select_material(self, _evt=None):
         sel = self.tree.selection()
@@ -870,11 +1049,10 @@ class MaterialsTab(ctk.CTkFrame):
         self.refresh_lists(selected_family=family, selected_subfamily=subfamily)
         self.var_std.set(_row_str(row, "standard"))
         self.var_notes.set(_row_str(row, "notes"))
-        self.box_chem.set_material(self.material_id)
-        self.box_phys.set_material(self.material_id)
-        self.box_mech.set_material(self.material_id)
+        self._set_property_boxes(self.material_id)
 
     def save_material(self):
+        uppercase_vars((self.var_std, self.var_notes))
         family = (self.var_family.get() or "").strip()
         desc = (self.var_desc.get() or "").strip()
         if not family or family == self.EMPTY_CHOICE or not desc or desc == self.EMPTY_CHOICE:
@@ -888,11 +1066,18 @@ class MaterialsTab(ctk.CTkFrame):
             else:
                 self.db.update_material(self.material_id, family, desc, self.var_std.get(), self.var_notes.get())
                 messagebox.showinfo("Materiali", "Aggiornato.")
-            self.refresh_materials()
-            self._select_material_row_if_present(self.material_id)
-            self.box_chem.set_material(self.material_id)
-            self.box_phys.set_material(self.material_id)
-            self.box_mech.set_material(self.material_id)
+            mid = self.material_id
+
+            def _reselect():
+                if not self._select_material_row_if_present(mid):
+                    self._set_property_boxes(mid)
+
+            if (self.var_search.get() or "").strip():
+                # Con un filtro attivo il materiale potrebbe entrare/uscire dall'elenco: serve la ricerca.
+                self.refresh_materials(then=_reselect)
+            else:
+                self._refresh_material_row(mid)
+                _reselect()
         except Exception as e:
             messagebox.showerror("Materiali", f"Errore salvataggio: {e}")
 
@@ -903,14 +1088,15 @@ class MaterialsTab(ctk.CTkFrame):
             return
         try:
             self.db.delete_material(self.material_id)
+            self._pager.remove(str(self.material_id))
+            self._prop_cache.pop(self.material_id, None)
             self.new_material()
-            self.refresh_materials()
         except Exception as e:
             messagebox.showerror("Materiali", f"Errore eliminazione: {e}")
 
 
 class _TreatmentBox(ctk.CTkFrame):
-    def __init__(self, master, db: AppService, title: str, kind: str):
+    def __init__(self, master, db: AppService, title: str, kind: str, rows=None):
         super().__init__(master)
         self.db = db
         self.title = title
@@ -921,17 +1107,14 @@ class _TreatmentBox(ctk.CTkFrame):
         self.var_std = ctk.StringVar()
         self.var_notes = ctk.StringVar()
 
-        for v in [self.var_desc, self.var_std, self.var_notes]:
-            bind_uppercase(v)
-
         self._build_ui()
-        self.refresh()
+        self.refresh(rows)
 
     def _build_ui(self):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(2, weight=1)
 
-        ctk.CTkLabel(self, text=self.title, font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(self, text=self.title, font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -956,19 +1139,18 @@ class _TreatmentBox(ctk.CTkFrame):
         # form
         form = ctk.CTkFrame(self)
         form.grid(row=2, column=0, sticky="nsew", padx=8, pady=(0, 8))
-        form.grid_columnconfigure(0, weight=1)
+        form.grid_columnconfigure((0, 1), weight=1)
         form.grid_rowconfigure(3, weight=1)
 
         ctk.CTkLabel(form, text="DESCRIZIONE").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 2))
         self.ent_desc = ctk.CTkEntry(form, textvariable=self.var_desc)
         self.ent_desc.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(self.ent_desc, self.var_desc)
 
         ctk.CTkLabel(form, text="NORMA").grid(row=0, column=1, sticky="w", padx=6, pady=(6, 2))
         self.ent_std = ctk.CTkEntry(form, textvariable=self.var_std)
         self.ent_std.grid(row=1, column=1, sticky="ew", padx=6, pady=(0, 6))
-
-        form.grid_columnconfigure(0, weight=1)
-        form.grid_columnconfigure(1, weight=1)
+        uppercase_on_commit(self.ent_std, self.var_std)
 
         ctk.CTkLabel(form, text="CARATTERISTICHE").grid(row=2, column=0, sticky="w", padx=6, pady=(6, 2))
         self.txt_char = ctk.CTkTextbox(form, height=90)
@@ -977,6 +1159,7 @@ class _TreatmentBox(ctk.CTkFrame):
         ctk.CTkLabel(form, text="NOTE").grid(row=4, column=0, sticky="w", padx=6, pady=(6, 2))
         self.ent_notes = ctk.CTkEntry(form, textvariable=self.var_notes)
         self.ent_notes.grid(row=5, column=0, columnspan=2, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(self.ent_notes, self.var_notes)
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=6, column=0, columnspan=2, sticky="e", padx=6, pady=(0, 6))
@@ -984,12 +1167,12 @@ class _TreatmentBox(ctk.CTkFrame):
         ctk.CTkButton(btns, text="Salva", width=90, command=self.save).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete).pack(side="left", padx=4)
 
-    def refresh(self):
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        rows = self.db.fetch_heat_treatments() if self.kind == "heat" else self.db.fetch_surface_treatments()
-        for r in rows:
-            self.tree.insert("", "end", iid=str(r["id"]), values=(_row_str(r, "description"), _row_str(r, "updated_at")))
+    def refresh(self, prefetched=None):
+        clear_treeview(self.tree)
+        rows = prefetched
+        if rows is None:
+            rows = self.db.fetch_heat_treatments() if self.kind == "heat" else self.db.fetch_surface_treatments()
+        insert_rows(self.tree, [(str(r["id"]), _str_values(_DESC_AGG_VALUES(r))) for r in rows])
 
     def new(self):
         self.tid = None
@@ -1011,6 +1194,7 @@ class _TreatmentBox(ctk.CTkFrame):
         self.txt_char.insert("1.0", _row_str(row, "characteristics"))
 
     def save(self):
+        uppercase_vars((self.var_desc, self.var_std, self.var_notes))
         desc = (self.var_desc.get() or "").strip()
         if not desc:
             messagebox.showwarning("Trattamenti", "Compila almeno DESCRIZIONE.")
@@ -1060,8 +1244,9 @@ class TreatmentsTab(ctk.CTkFrame):
         paned = ttk.Panedwindow(self, orient="horizontal")
         paned.grid(row=0, column=0, sticky="nsew", padx=8, pady=8)
 
-        self.box_heat = _TreatmentBox(paned, db, "Trattamenti termici", "heat")
-        self.box_surf = _TreatmentBox(paned, db, "Trattamenti superficiali", "surface")
+        heat_rows, surf_rows = db.fetch_treatments_pair()
+        self.box_heat = _TreatmentBox(paned, db, "Trattamenti termici", "heat", heat_rows)
+        self.box_surf = _TreatmentBox(paned, db, "Trattamenti superficiali", "surface", surf_rows)
         paned.add(self.box_heat, weight=1)
         paned.add(self.box_surf, weight=1)
 
@@ -1069,7 +1254,7 @@ class TreatmentsTab(ctk.CTkFrame):
 class _SimpleCodeBox(ctk.CTkFrame):
     """Gestione elenco descrizioni (semi_type / semi_state), con codice interno automatico."""
 
-    def __init__(self, master, db: AppService, title: str, kind: str):
+    def __init__(self, master, db: AppService, title: str, kind: str, rows=None):
         super().__init__(master)
         self.db = db
         self.title = title
@@ -1077,16 +1262,15 @@ class _SimpleCodeBox(ctk.CTkFrame):
         self.item_id: Optional[int] = None
 
         self.var_desc = ctk.StringVar()
-        bind_uppercase(self.var_desc)
 
         self._build_ui()
-        self.refresh()
+        self.refresh(rows)
 
     def _build_ui(self):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
-        ctk.CTkLabel(self, text=self.title, font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(self, text=self.title, font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -1112,7 +1296,9 @@ class _SimpleCodeBox(ctk.CTkFrame):
         form.grid_columnconfigure(0, weight=1)
 
         ctk.CTkLabel(form, text="DESCRIZIONE").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 2))
-        ctk.CTkEntry(form, textvariable=self.var_desc).grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        ent_desc = ctk.CTkEntry(form, textvariable=self.var_desc)
+        ent_desc.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_desc, self.var_desc)
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=2, column=0, sticky="e", padx=6, pady=(0, 6))
@@ -1120,12 +1306,12 @@ class _SimpleCodeBox(ctk.CTkFrame):
         ctk.CTkButton(btns, text="Salva", width=90, command=self.save).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete).pack(side="left", padx=4)
 
-    def refresh(self):
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        rows = self.db.fetch_semi_types() if self.kind == "type" else self.db.fetch_semi_states()
-        for r in rows:
-            self.tree.insert("", "end", iid=str(r["id"]), values=(_row_str(r, "description"),))
+    def refresh(self, prefetched=None):
+        clear_treeview(self.tree)
+        rows = prefetched
+        if rows is None:
+            rows = self.db.fetch_semi_types() if self.kind == "type" else self.db.fetch_semi_states()
+        insert_rows(self.tree, [(str(r["id"]), (_row_str(r, "description"),)) for r in rows])
 
     def new(self):
         self.item_id = None
@@ -1140,6 +1326,7 @@ class _SimpleCodeBox(ctk.CTkFrame):
         self.var_desc.set(vals[0] if vals else "")
 
     def save(self):
+        uppercase_vars((self.var_desc,))
         desc = (self.var_desc.get() or "").strip()
         if not desc:
             messagebox.showwarning("Semilavorati", "Compila DESCRIZIONE.")
@@ -1189,7 +1376,6 @@ class SemiTypeDialog(ctk.CTkToplevel):
         self._rows: List[Any] = []
 
         self.var_desc = ctk.StringVar()
-        bind_uppercase(self.var_desc)
 
         self.title("Gestione Famiglie Semilavorati")
         self.geometry("560x520")
@@ -1219,7 +1405,7 @@ class SemiTypeDialog(ctk.CTkToplevel):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
-        ctk.CTkLabel(self, text="Famiglie semilavorati", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(self, text="Famiglie semilavorati", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=10, pady=(10, 4)
         )
 
@@ -1242,7 +1428,9 @@ class SemiTypeDialog(ctk.CTkToplevel):
         form.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
         form.grid_columnconfigure(0, weight=1)
         ctk.CTkLabel(form, text="DESCRIZIONE").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 2))
-        ctk.CTkEntry(form, textvariable=self.var_desc).grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        ent_desc = ctk.CTkEntry(form, textvariable=self.var_desc)
+        ent_desc.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_desc, self.var_desc)
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=2, column=0, sticky="e", padx=6, pady=(0, 6))
@@ -1252,10 +1440,8 @@ class SemiTypeDialog(ctk.CTkToplevel):
 
     def refresh(self):
         self._rows = list(self.db.fetch_semi_types())
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        for r in self._rows:
-            self.tree.insert("", "end", iid=str(r["id"]), values=(_row_str(r, "description"),))
+        clear_treeview(self.tree)
+        insert_rows(self.tree, [(str(r["id"]), (_row_str(r, "description"),)) for r in self._rows])
 
         if self.type_id is not None and self.tree.exists(str(self.type_id)):
             self.tree.selection_set(str(self.type_id))
@@ -1276,6 +1462,7 @@ class SemiTypeDialog(ctk.CTkToplevel):
         self.var_desc.set(vals[0] if vals else "")
 
     def save_type(self):
+        uppercase_vars((self.var_desc,))
         desc = (self.var_desc.get() or "").strip()
         if not desc:
             messagebox.showwarning("Semilavorati", "Compila DESCRIZIONE.")
@@ -1316,7 +1503,6 @@ class SemiStateDialog(ctk.CTkToplevel):
         self._rows: List[Any] = []
 
         self.var_desc = ctk.StringVar()
-        bind_uppercase(self.var_desc)
 
         self.title("Gestione Stati Semilavorato")
         self.geometry("560x520")
@@ -1346,7 +1532,7 @@ class SemiStateDialog(ctk.CTkToplevel):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
-        ctk.CTkLabel(self, text="Stati semilavorato", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(self, text="Stati semilavorato", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=10, pady=(10, 4)
         )
 
@@ -1369,7 +1555,9 @@ class SemiStateDialog(ctk.CTkToplevel):
         form.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
         form.grid_columnconfigure(0, weight=1)
         ctk.CTkLabel(form, text="DESCRIZIONE").grid(row=0, column=0, sticky="w", padx=6, pady=(6, 2))
-        ctk.CTkEntry(form, textvariable=self.var_desc).grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        ent_desc = ctk.CTkEntry(form, textvariable=self.var_desc)
+        ent_desc.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
+        uppercase_on_commit(ent_desc, self.var_desc)
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=2, column=0, sticky="e", padx=6, pady=(0, 6))
@@ -1379,10 +1567,8 @@ class SemiStateDialog(ctk.CTkToplevel):
 
     def refresh(self):
         self._rows = list(self.db.fetch_semi_states())
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        for r in self._rows:
-            self.tree.insert("", "end", iid=str(r["id"]), values=(_row_str(r, "description"),))
+        clear_treeview(self.tree)
+        insert_rows(self.tree, [(str(r["id"]), (_row_str(r, "description"),)) for r in self._rows])
 
         if self.state_id is not None and self.tree.exists(str(self.state_id)):
             self.tree.selection_set(str(self.state_id))
@@ -1403,6 +1589,7 @@ class SemiStateDialog(ctk.CTkToplevel):
         self.var_desc.set(vals[0] if vals else "")
 
     def save_state(self):
+        uppercase_vars((self.var_desc,))
         desc = (self.var_desc.get() or "").strip()
         if not desc:
             messagebox.showwarning("Semilavorati", "Compila DESCRIZIONE.")
@@ -1456,8 +1643,9 @@ class SemiTaxonomyDialog(ctk.CTkToplevel):
         paned = ttk.Panedwindow(self, orient="horizontal")
         paned.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
 
-        self.box_types = _SimpleCodeBox(paned, self.db, "Famiglie semilavorati", "type")
-        self.box_states = _SimpleCodeBox(paned, self.db, "Stati semilavorato", "state")
+        type_rows, state_rows = self.db.fetch_semi_pair()
+        self.box_types = _SimpleCodeBox(paned, self.db, "Famiglie semilavorati", "type", type_rows)
+        self.box_states = _SimpleCodeBox(paned, self.db, "Stati semilavorato", "state", state_rows)
         paned.add(self.box_types, weight=1)
         paned.add(self.box_states, weight=1)
 
@@ -1474,6 +1662,37 @@ class SemiTaxonomyDialog(ctk.CTkToplevel):
         self.destroy()
 
 
+# Guida formati dimensioni: testo gia composto, con la riga sul tipo corrente per i tipi che la prevedono.
+_DIM_HINT_BASE = "\n".join(
+    [
+        "Promemoria inserimento dimensioni",
+        "",
+        "Formati principali:",
+        "- TONDI: D20 oppure O20",
+        "- ESAGONI: CH24",
+        "- PIATTI: 40X10 (kg/m)",
+        "- LAMIERE: SP3 oppure 1000X2000X3 (calcolo in kg/m2)",
+        "- TUBI: 30X2 (diametro x spessore)",
+        "- TUBOLARI: 40X20X2",
+        "",
+        "Profilati L/U/T (peso automatico):",
+        "- L: L40X40X4 oppure L50X30X5",
+        "- U: U80X45X6 oppure U80X45X8X6 (TFxTW)",
+        "- T: T80X60X8 oppure T80X60X8X6 (TFxTW)",
+        "",
+        "Nota: TRAVI (IPE/HEA/IPN/UPN...) peso/m manuale per ora.",
+    ]
+)
+_DIM_HINTS = {
+    t: f"{_DIM_HINT_BASE}\n\nTipo corrente: {note}"
+    for t, note in (
+        ("PROFILATI", "PROFILATI."),
+        ("TRAVI", "TRAVI (inserimento peso/m manuale)."),
+        ("LAMIERE", "LAMIERE (peso automatico in kg/m2)."),
+    )
+}
+
+
 class SemiDimensionsBox(ctk.CTkFrame):
     """Lista dimensionale del semilavorato: dimensione + peso al metro."""
 
@@ -1483,22 +1702,30 @@ class SemiDimensionsBox(ctk.CTkFrame):
         self.semi_item_id: Optional[int] = None
         self.dim_id: Optional[int] = None
         self._current_type_desc: str = ""
+        # Forma normalizzata calcolata una volta per semilavorato (etichetta peso e guida).
+        self._current_type_desc_norm: str = ""
         self._hint_popup: Optional[ctk.CTkToplevel] = None
+        self._hint_title: Optional[ctk.CTkLabel] = None
+        self._hint_box: Optional[ctk.CTkTextbox] = None
+        self._hint_popup_type: Optional[str] = None
+        # Snapshot iid -> valori delle righe nel Treeview (sync_treeview).
+        self._shown: Dict[str, tuple] = {}
 
         self.var_dimension = ctk.StringVar()
         self.var_weight = ctk.StringVar()
         self.var_preferred = ctk.BooleanVar(value=False)
-        bind_uppercase(self.var_dimension)
-        bind_uppercase(self.var_weight)
 
         self._build_ui()
+        # MAIUSCOLO alla conferma del campo e al salvataggio, non a ogni tasto.
+        uppercase_on_commit(self.ent_dimension, self.var_dimension)
+        uppercase_on_commit(self.ent_weight, self.var_weight)
         self._set_enabled(False)
 
     def _build_ui(self):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(1, weight=1)
 
-        ctk.CTkLabel(self, text="Lista dimensionale", font=ctk.CTkFont(size=15, weight="bold")).grid(
+        ctk.CTkLabel(self, text="Lista dimensionale", font=get_font(15, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -1558,113 +1785,108 @@ class SemiDimensionsBox(ctk.CTkFrame):
         for b in (self.btn_new, self.btn_save, self.btn_delete):
             b.configure(state=btn_state)
 
-    def set_semi_item(self, semi_item_id: Optional[int]):
+    def set_semi_item(self, semi_item_id: Optional[int], type_desc: Optional[str] = None):
+        """`type_desc` gia noto dal chiamante evita di rileggere il semilavorato."""
         self.semi_item_id = semi_item_id
         self.dim_id = None
-        self.var_dimension.set("")
-        self.var_weight.set("")
-        self.var_preferred.set(False)
+        self._set_form("", "", False)
         self._current_type_desc = ""
-        if self.semi_item_id:
+        if self.semi_item_id and type_desc is not None:
+            self._current_type_desc = type_desc
+        elif self.semi_item_id:
             try:
                 row = self.db.read_semi_item(self.semi_item_id)
                 self._current_type_desc = _row_str(row, "type_desc")
             except Exception:
                 self._current_type_desc = ""
+        self._current_type_desc_norm = normalize_upper(self._current_type_desc)
         self._refresh_weight_label()
         self.refresh()
         self._set_enabled(bool(self.semi_item_id))
 
+    def is_showing(self, semi_item_id: Optional[int], type_desc: str) -> bool:
+        return self.semi_item_id == semi_item_id and self._current_type_desc == type_desc
+
     def _refresh_weight_label(self):
-        t = normalize_upper(self._current_type_desc or "")
-        if t == "LAMIERE":
+        if self._current_type_desc_norm == "LAMIERE":
             self.lbl_weight.configure(text="PESO AUTO (KG/M2)")
         else:
             self.lbl_weight.configure(text="PESO AUTO (KG/M)")
 
     @staticmethod
-    def _hint_text(type_desc: str) -> str:
-        t = normalize_upper(type_desc or "")
-        lines = [
-            "Promemoria inserimento dimensioni",
-            "",
-            "Formati principali:",
-            "- TONDI: D20 oppure O20",
-            "- ESAGONI: CH24",
-            "- PIATTI: 40X10 (kg/m)",
-            "- LAMIERE: SP3 oppure 1000X2000X3 (calcolo in kg/m2)",
-            "- TUBI: 30X2 (diametro x spessore)",
-            "- TUBOLARI: 40X20X2",
-            "",
-            "Profilati L/U/T (peso automatico):",
-            "- L: L40X40X4 oppure L50X30X5",
-            "- U: U80X45X6 oppure U80X45X8X6 (TFxTW)",
-            "- T: T80X60X8 oppure T80X60X8X6 (TFxTW)",
-            "",
-            "Nota: TRAVI (IPE/HEA/IPN/UPN...) peso/m manuale per ora.",
-        ]
-        if t == "PROFILATI":
-            lines.extend(["", "Tipo corrente: PROFILATI."])
-        if t == "TRAVI":
-            lines.extend(["", "Tipo corrente: TRAVI (inserimento peso/m manuale)."])
-        if t == "LAMIERE":
-            lines.extend(["", "Tipo corrente: LAMIERE (peso automatico in kg/m2)."])
-        return "\n".join(lines)
+    def _hint_text(type_desc_norm: str) -> str:
+        return _DIM_HINTS.get(type_desc_norm, _DIM_HINT_BASE)
 
     def _open_hint_popup(self):
         try:
-            if self._hint_popup is not None and self._hint_popup.winfo_exists():
-                self._hint_popup.focus_set()
-                return
+            alive = self._hint_popup is not None and bool(self._hint_popup.winfo_exists())
         except Exception:
-            self._hint_popup = None
-
+            alive = False
+        if not alive:
+            self._build_hint_popup()
+        # Testo riscritto solo se il tipo e cambiato dall'ultima apertura.
+        if self._hint_popup_type != self._current_type_desc:
+            self._set_hint_text()
+        popup = self._hint_popup
+        popup.deiconify()
+        popup.lift()
+        popup.focus_set()
+
+    def _build_hint_popup(self):
         popup = ctk.CTkToplevel(self)
         self._hint_popup = popup
+        self._hint_popup_type = None
         popup.title("Guida Inserimento Dimensioni")
         popup.geometry("780x460")
         popup.minsize(620, 360)
         popup.transient(self.winfo_toplevel())
+        # Nascosto e non distrutto: la riapertura non ricostruisce Toplevel e Textbox.
+        popup.protocol("WM_DELETE_WINDOW", popup.withdraw)
 
         popup.grid_columnconfigure(0, weight=1)
         popup.grid_rowconfigure(1, weight=1)
 
-        title = "Guida formati dimensioni e peso al metro"
-        if self._current_type_desc:
-            title = f"{title} - Tipo: {self._current_type_desc}"
-        ctk.CTkLabel(popup, text=title, font=ctk.CTkFont(size=15, weight="bold")).grid(
-            row=0, column=0, sticky="w", padx=12, pady=(10, 6)
-        )
+        self._hint_title = ctk.CTkLabel(popup, text="", font=get_font(15, "bold"))
+        self._hint_title.grid(row=0, column=0, sticky="w", padx=12, pady=(10, 6))
 
-        txt = ctk.CTkTextbox(popup, wrap="word")
-        txt.grid(row=1, column=0, sticky="nsew", padx=12, pady=(0, 8))
-        txt.insert("1.0", self._hint_text(self._current_type_desc))
-        txt.configure(state="disabled")
+        self._hint_box = ctk.CTkTextbox(popup, wrap="word")
+        self._hint_box.grid(row=1, column=0, sticky="nsew", padx=12, pady=(0, 8))
 
         btns = ctk.CTkFrame(popup, fg_color="transparent")
         btns.grid(row=2, column=0, sticky="e", padx=12, pady=(0, 12))
-        ctk.CTkButton(btns, text="Chiudi", width=100, command=popup.destroy).pack(side="left")
+        ctk.CTkButton(btns, text="Chiudi", width=100, command=popup.withdraw).pack(side="left")
+
+    def _set_hint_text(self):
+        type_desc = self._current_type_desc
+        title = "Guida formati dimensioni e peso al metro"
+        if type_desc:
+            title = f"{title} - Tipo: {type_desc}"
+        self._hint_title.configure(text=title)
+        txt = self._hint_box
+        txt.configure(state="normal")
+        txt.delete("1.0", "end")
+        txt.insert("1.0", self._hint_text(self._current_type_desc_norm))
+        txt.configure(state="disabled")
+        self._hint_popup_type = type_desc
 
     def refresh(self):
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        if not self.semi_item_id:
-            return
-        rows = self.db.fetch_semi_dimensions(self.semi_item_id)
-        for r in rows:
-            pref = "X" if int(r["preferred"] or 0) else ""
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(r["id"]),
-                values=(pref, _row_str(r, "dimension"), _row_str(r, "weight_per_m")),
-            )
+        rows = self.db.fetch_semi_dimensions(self.semi_item_id) if self.semi_item_id else []
+        # Confronto con le righe mostrate: un salvataggio senza modifiche non ridisegna nulla.
+        self._shown = sync_treeview(
+            self.tree,
+            [(str(r["id"]), _str_values(_SEMI_DIM_VALUES(r))) for r in rows],
+            self._shown,
+        )
+
+    def _set_form(self, dimension: str, weight: str, preferred: bool):
+        # Scrive solo i campi che cambiano: scorrendo l'elenco con le frecce si evitano set (e ridisegni) inutili.
+        for var, v in ((self.var_dimension, dimension), (self.var_weight, weight), (self.var_preferred, preferred)):
+            if var.get() != v:
+                var.set(v)
 
     def new_dimension(self):
         self.dim_id = None
-        self.var_dimension.set("")
-        self.var_weight.set("")
-        self.var_preferred.set(False)
+        self._set_form("", "", False)
         self.ent_dimension.focus_set()
 
     def _on_select(self, _evt=None):
@@ -1672,23 +1894,44 @@ class SemiDimensionsBox(ctk.CTkFrame):
         if not sel:
             return
         self.dim_id = int(sel[0])
-        vals = self.tree.item(sel[0], "values")
+        # Valori dallo snapshot delle righe mostrate, senza rileggerli da Tk.
+        vals = self._shown.get(sel[0])
         if not vals:
             return
-        self.var_preferred.set(str(vals[0] or "").strip().upper() in {"X", "1", "TRUE", "SI"})
-        self.var_dimension.set(vals[1] or "")
-        self.var_weight.set(vals[2] or "")
+        self._set_form(vals[1], vals[2], vals[0] == "X")
 
     def save_dimension(self):
         if not self.semi_item_id:
             messagebox.showwarning("Semilavorati", "Salva prima il semilavorato per gestire la lista dimensionale.")
             return
+        uppercase_vars((self.var_dimension, self.var_weight))
         dimension = (self.var_dimension.get() or "").strip()
         if not dimension:
             messagebox.showwarning("Semilavorati", "Compila DIMENSIONE.")
             return
         manual_weight = (self.var_weight.get() or "").strip()
-        calc_weight = self.db.calculate_semi_weight_per_m(self.semi_item_id, dimension)
+        preferred = 1 if self.var_preferred.get() else 0
+        sid, dim_id = self.semi_item_id, self.dim_id
+        # Parsing della dimensione e lettura densita sul thread di lettura; Salva resta disattivo fino all'esito.
+        self.btn_save.configure(state="disabled")
+
+        def _done(calc_weight: Optional[float]):
+            self.btn_save.configure(state="normal" if self.semi_item_id else "disabled")
+            if self.semi_item_id != sid or self.dim_id != dim_id:
+                messagebox.showwarning(
+                    "Semilavorati",
+                    "Selezione cambiata durante il calcolo del peso/m: dimensione non salvata.",
+                )
+                return
+            self._store_dimension(dimension, manual_weight, preferred, calc_weight)
+
+        def _failed(exc: BaseException):
+            self.btn_save.configure(state="normal" if self.semi_item_id else "disabled")
+            messagebox.showerror("Semilavorati", f"Errore calcolo peso/m: {exc}")
+
+        run_in_background(self, self.db.submit_read("calculate_semi_weight_per_m", sid, dimension), _done, _failed)
+
+    def _store_dimension(self, dimension: str, manual_weight: str, preferred: int, calc_weight: Optional[float]):
         if calc_weight is not None:
             weight_value = f"{calc_weight:.3f}"
             self.var_weight.set(weight_value)
@@ -1707,17 +1950,17 @@ class SemiDimensionsBox(ctk.CTkFrame):
                     self.semi_item_id,
                     dimension,
                     weight_value,
-                    preferred=1 if self.var_preferred.get() else 0,
+                    preferred=preferred,
                 )
             else:
                 self.db.update_semi_dimension(
                     self.dim_id,
                     dimension,
                     weight_value,
-                    preferred=1 if self.var_preferred.get() else 0,
+                    preferred=preferred,
                 )
             self.refresh()
-            if self.dim_id is not None and self.tree.exists(str(self.dim_id)):
+            if self.dim_id is not None and str(self.dim_id) in self._shown:
                 self.tree.selection_set(str(self.dim_id))
                 self.tree.focus(str(self.dim_id))
         except Exception as e:
@@ -1737,6 +1980,7 @@ class SemiDimensionsBox(ctk.CTkFrame):
 
 
 class SemilavoratiTab(ctk.CTkFrame):
+    EMPTY_CHOICE = "—"
     def __init__(self, master, db: AppService):
         super().__init__(master)
         self.db = db
@@ -1752,21 +1996,32 @@ class SemilavoratiTab(ctk.CTkFrame):
         self.var_std = ctk.StringVar()
         self.var_notes = ctk.StringVar()
 
-        for v in [self.var_desc, self.var_dim, self.var_std, self.var_notes]:
-            bind_uppercase(v)
-
         # dropdown variables (type/state/material)
         self.var_type = ctk.StringVar()
         self.var_state = ctk.StringVar()
-        self.var_mat = ctk.StringVar()  # "—" or family - subfamily
+        self.var_mat = ctk.StringVar()  # EMPTY_CHOICE or family - subfamily
 
         self._types: List[Tuple[int, str]] = []      # id, description
         self._states: List[Tuple[int, str]] = []     # id, description
         self._materials: List[Tuple[int, str]] = []  # id, material label (family - subfamily)
+        # Indici per descrizione/etichetta/id, ricostruiti con le liste in refresh_ref_lists.
+        self._type_by_desc: Dict[str, int] = {}
+        self._state_by_desc: Dict[str, int] = {}
+        self._mat_id_by_label: Dict[str, int] = {}
+        self._mat_label_by_id: Dict[int, str] = {}
+        self._mat_values: List[str] = [self.EMPTY_CHOICE]
+        # (id, famiglia, sottofamiglia) da cui sono state calcolate le etichette materiale.
+        self._materials_key: Optional[tuple] = None
+        self._last_search: Optional[Tuple[str, bool]] = None
+        # Righe dell'ultima ricerca per id: la selezione non rilegge il semilavorato dal DB.
+        self._row_cache: Dict[int, Any] = {}
+        # Digitazione e click su "Solo pref. dim" ravvicinati: una sola ricerca quando l'utente si ferma.
+        self._search_soon = debounced(self, 200, self._on_search_changed)
 
         self._build_ui()
         self.refresh_ref_lists()
         self.refresh_items()
+        self.var_search.trace_add("write", self._search_soon)
 
     def _build_ui(self):
         self.grid_columnconfigure(0, weight=1)
@@ -1780,7 +2035,7 @@ class SemilavoratiTab(ctk.CTkFrame):
         left.grid_rowconfigure(2, weight=1)
         left.grid_columnconfigure(0, weight=1)
 
-        ctk.CTkLabel(left, text="Semilavorati", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(left, text="Semilavorati", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
         sbar = ctk.CTkFrame(left, fg_color="transparent")
@@ -1797,7 +2052,7 @@ class SemilavoratiTab(ctk.CTkFrame):
             sbar,
             text="Solo pref. dim",
             variable=self.var_only_preferred_dim,
-            command=self.refresh_items,
+            command=self._search_soon,
         ).grid(row=0, column=5, sticky="w", padx=(10, 0))
 
         lf = ctk.CTkFrame(left)
@@ -1823,8 +2078,9 @@ class SemilavoratiTab(ctk.CTkFrame):
         make_treeview_sortable(self.tree)
         self.tree.grid(row=0, column=0, sticky="nsew")
         sb = ttk.Scrollbar(lf, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=sb.set)
         sb.grid(row=0, column=1, sticky="ns")
+        # Con migliaia di semilavorati solo la prima pagina diventa item Tk; il resto arriva scorrendo.
+        self._pager = TreeviewPager(self.tree, sb)
         self.tree.bind("<<TreeviewSelect>>", self._on_select_item)
 
         # right form
@@ -1832,7 +2088,7 @@ class SemilavoratiTab(ctk.CTkFrame):
         right.grid_columnconfigure(0, weight=1)
         right.grid_rowconfigure(2, weight=1)
 
-        ctk.CTkLabel(right, text="Dettaglio", font=ctk.CTkFont(size=16, weight="bold")).grid(
+        ctk.CTkLabel(right, text="Dettaglio", font=get_font(16, "bold")).grid(
             row=0, column=0, sticky="w", padx=8, pady=(8, 4)
         )
 
@@ -1845,42 +2101,71 @@ class SemilavoratiTab(ctk.CTkFrame):
             ctk.CTkLabel(form, text=t).grid(row=r, column=c, sticky="w", padx=6, pady=(6, 2))
 
         lab("FAMIGLIA SEMILAVORATO", 0, 0)
-        self.opt_type = ctk.CTkOptionMenu(form, values=["—"], variable=self.var_type)
+        self.opt_type = ctk.CTkOptionMenu(form, values=[self.EMPTY_CHOICE], variable=self.var_type)
         self.opt_type.grid(row=1, column=0, sticky="ew", padx=6, pady=(0, 6))
 
         lab("STATO / SOTTOFAMIGLIA", 0, 1)
-        self.opt_state = ctk.CTkOptionMenu(form, values=["—"], variable=self.var_state)
+        self.opt_state = ctk.CTkOptionMenu(form, values=[self.EMPTY_CHOICE], variable=self.var_state)
         self.opt_state.grid(row=1, column=1, sticky="ew", padx=6, pady=(0, 6))
 
         lab("MATERIALE", 0, 2)
-        self.opt_mat = ctk.CTkOptionMenu(form, values=["—"], variable=self.var_mat)
+        self.opt_mat = ctk.CTkOptionMenu(form, values=[self.EMPTY_CHOICE], variable=self.var_mat)
         self.opt_mat.grid(row=1, column=2, sticky="ew", padx=6, pady=(0, 6))
 
         lab("NORMA", 0, 3)
-        ctk.CTkEntry(form, textvariable=self.var_std).grid(row=1, column=3, sticky="ew", padx=6, pady=(0, 6))
+        ent_std = ctk.CTkEntry(form, textvariable=self.var_std)
+        ent_std.grid(row=1, column=3, sticky="ew", padx=6, pady=(0, 6))
 
         lab("DESCRIZIONE", 2, 0)
-        ctk.CTkEntry(form, textvariable=self.var_desc).grid(row=3, column=0, columnspan=2, sticky="ew", padx=6, pady=(0, 6))
+        ent_desc = ctk.CTkEntry(form, textvariable=self.var_desc)
+        ent_desc.grid(row=3, column=0, columnspan=2, sticky="ew", padx=6, pady=(0, 6))
 
         lab("DIMENSIONI", 2, 2)
-        ctk.CTkEntry(form, textvariable=self.var_dim).grid(row=3, column=2, columnspan=2, sticky="ew", padx=6, pady=(0, 6))
+        ent_dim = ctk.CTkEntry(form, textvariable=self.var_dim)
+        ent_dim.grid(row=3, column=2, columnspan=2, sticky="ew", padx=6, pady=(0, 6))
 
         lab("NOTE", 4, 0)
-        ctk.CTkEntry(form, textvariable=self.var_notes).grid(row=5, column=0, columnspan=4, sticky="ew", padx=6, pady=(0, 6))
+        ent_notes = ctk.CTkEntry(form, textvariable=self.var_notes)
+        ent_notes.grid(row=5, column=0, columnspan=4, sticky="ew", padx=6, pady=(0, 6))
+
+        # MAIUSCOLO alla conferma del campo e al salvataggio, non a ogni tasto.
+        self._upper_vars = (self.var_std, self.var_desc, self.var_dim, self.var_notes)
+        for ent, var in zip((ent_std, ent_desc, ent_dim, ent_notes), self._upper_vars):
+            uppercase_on_commit(ent, var)
 
         btns = ctk.CTkFrame(form, fg_color="transparent")
         btns.grid(row=6, column=0, columnspan=4, sticky="e", padx=6, pady=(0, 6))
+        # Esito del salvataggio in linea: nessun dialogo modale tra salvataggio e aggiornamento elenco.
+        self.lbl_status = ctk.CTkLabel(btns, text="", text_color="gray")
+        self.lbl_status.pack(side="left", padx=(0, 8))
+        self._clear_status_soon = debounced(self, 4000, lambda: self.lbl_status.configure(text=""))
         ctk.CTkButton(btns, text="Nuovo", width=90, command=self.new_item).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="Copia", width=90, command=self.copy_item).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="Salva", width=90, command=self.save_item).pack(side="left", padx=4)
         ctk.CTkButton(btns, text="Elimina", width=90, command=self.delete_item).pack(side="left", padx=4)
 
-        self.box_dims = SemiDimensionsBox(right, self.db)
-        self.box_dims.grid(row=2, column=0, sticky="nsew", padx=8, pady=(0, 8))
+        # Lista dimensionale creata alla prima selezione/salvataggio: il primo montaggio della scheda resta leggero.
+        self._dims_parent = right
+        self.box_dims: Optional[SemiDimensionsBox] = None
+        self._dims_placeholder = ctk.CTkLabel(
+            right, text="Seleziona un semilavorato per gestire la lista dimensionale.", text_color="gray"
+        )
+        self._dims_placeholder.grid(row=2, column=0, sticky="n", padx=8, pady=(12, 8))
 
         outer.add(left, weight=2)
         outer.add(right, weight=2)
 
+    def _ensure_box_dims(self) -> SemiDimensionsBox:
+        if self.box_dims is None:
+            self._dims_placeholder.destroy()
+            self.box_dims = SemiDimensionsBox(self._dims_parent, self.db)
+            self.box_dims.grid(row=2, column=0, sticky="nsew", padx=8, pady=(0, 8))
+        return self.box_dims
+
+    def _show_status(self, text: str):
+        self.lbl_status.configure(text=text)
+        self._clear_status_soon()
+
     def _on_taxonomy_dialog_closed(self):
         self._taxonomy_dialog = None
         self.refresh_ref_lists()
@@ -1899,56 +2184,65 @@ class SemilavoratiTab(ctk.CTkFrame):
     def refresh_ref_lists(self):
         self._types = [(int(r["id"]), str(r["description"])) for r in self.db.fetch_semi_types()]
         self._states = [(int(r["id"]), str(r["description"])) for r in self.db.fetch_semi_states()]
-        mats = self.db.search_materials("")
-        self._materials = []
-        base_counts: Dict[str, int] = {}
-        for r in mats:
-            mid = int(r["id"])
-            base_label = f"{_row_str(r, 'family')} - {_row_str(r, 'description')}".strip(" -")
-            idx = base_counts.get(base_label, 0) + 1
-            base_counts[base_label] = idx
-            label = base_label if idx == 1 else f"{base_label} ({idx})"
-            self._materials.append((mid, label))
-
-        type_vals = [t[1] for t in self._types] or ["—"]
-        state_vals = [s[1] for s in self._states] or ["—"]
-        mat_vals = ["—"] + [m[1] for m in self._materials]
-
-        self.opt_type.configure(values=type_vals)
-        self.opt_state.configure(values=state_vals)
-        self.opt_mat.configure(values=mat_vals)
+        mats_key = tuple((int(r["id"]), r["family"], r["description"]) for r in self.db.search_materials(""))
+        if mats_key != self._materials_key:
+            # Etichette ricalcolate solo se materiali o descrizioni sono cambiati.
+            self._materials_key = mats_key
+            self._materials = self._material_labels(mats_key)
+            # Indici e valori del menu materiale seguono le etichette.
+            self._mat_id_by_label = {l: mid for mid, l in reversed(self._materials)}
+            self._mat_label_by_id = {mid: l for mid, l in reversed(self._materials)}
+            self._mat_values = [self.EMPTY_CHOICE] + [m[1] for m in self._materials]
+
+        # A parita di chiave vale la prima voce, come nella vecchia ricerca lineare.
+        self._type_by_desc = {d: tid for tid, d in reversed(self._types)}
+        self._state_by_desc = {d: sid for sid, d in reversed(self._states)}
+
+        type_vals = [t[1] for t in self._types] or [self.EMPTY_CHOICE]
+        state_vals = [s[1] for s in self._states] or [self.EMPTY_CHOICE]
+
+        set_option_values(self.opt_type, type_vals)
+        set_option_values(self.opt_state, state_vals)
+        set_option_values(self.opt_mat, self._mat_values)
 
         if self.var_type.get() not in type_vals:
             self.var_type.set(type_vals[0])
         if self.var_state.get() not in state_vals:
             self.var_state.set(state_vals[0])
-        if self.var_mat.get() not in mat_vals:
-            self.var_mat.set("—")
+        mat = self.var_mat.get()
+        if mat != self.EMPTY_CHOICE and mat not in self._mat_id_by_label:
+            self.var_mat.set(self.EMPTY_CHOICE)
+
+    def _search_key(self) -> Tuple[str, bool]:
+        return (self.var_search.get() or "").strip(), bool(self.var_only_preferred_dim.get())
+
+    def _on_search_changed(self):
+        if self._search_key() != self._last_search:
+            self.refresh_items()
+
+    @staticmethod
+    def _material_labels(mats: Iterable[Tuple[int, Any, Any]]) -> List[Tuple[int, str]]:
+        """(id, "FAMIGLIA - SOTTOFAMIGLIA"), con suffisso (2), (3)... sulle etichette ripetute."""
+        out: List[Tuple[int, str]] = []
+        counts: Dict[str, int] = {}
+        append, count_of = out.append, counts.get
+        for mid, fam, desc in mats:
+            base = f"{fam or ''} - {desc or ''}".strip(" -")
+            counts[base] = c = count_of(base, 0) + 1
+            append((mid, base if c == 1 else f"{base} ({c})"))
+        return out
 
     def refresh_items(self):
-        for k in self.tree.get_children(""):
-            self.tree.delete(k)
-        q = (self.var_search.get() or "").strip()
-        rows = self.db.search_semi_items(
-            q,
-            only_preferred_dimension=bool(self.var_only_preferred_dim.get()),
+        q, only_pref = self._last_search = self._search_key()
+        rows = self.db.search_semi_items(q, only_preferred_dimension=only_pref)
+        self._row_cache = {int(r["id"]): r for r in rows}
+        # Righe preparate in Python; il pager tocca solo le differenze della pagina visibile.
+        self._pager.set_rows(
+            [
+                (str(r["id"]), _str_values(_SEMI_ITEM_VALUES(r)))
+                for r in rows
+            ]
         )
-        for r in rows:
-            pref = "X" if int(r["has_preferred_dimension"] or 0) else ""
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(r["id"]),
-                values=(
-                    pref,
-                    _row_str(r, "type_desc"),
-                    _row_str(r, "state_desc"),
-                    _row_str(r, "mat_label"),
-                    _row_str(r, "description"),
-                    _row_str(r, "dim_display") or _row_str(r, "dimensions"),
-                    _row_str(r, "updated_at"),
-                ),
-            )
 
     def new_item(self):
         self.item_id = None
@@ -1957,7 +2251,8 @@ class SemilavoratiTab(ctk.CTkFrame):
         self.var_dim.set("")
         self.var_std.set("")
         self.var_notes.set("")
-        self.box_dims.set_semi_item(None)
+        if self.box_dims is not None:
+            self.box_dims.set_semi_item(None)
         # keep dropdowns as-is
 
     def copy_item(self):
@@ -1966,11 +2261,9 @@ class SemilavoratiTab(ctk.CTkFrame):
         self._copy_from_item_id = self.item_id
         # just reset ID, keep current fields
         self.item_id = None
-        self.box_dims.set_semi_item(None)
-        messagebox.showinfo(
-            "Semilavorati",
-            "Dati copiati: salva per creare un nuovo semilavorato (verra copiata anche la lista dimensionale).",
-        )
+        if self.box_dims is not None:
+            self.box_dims.set_semi_item(None)
+        self._show_status("Dati copiati (anche le dimensioni): salva per creare il nuovo semilavorato.")
 
     def _on_select_item(self, _evt=None):
         sel = self.tree.selection()
@@ -1978,7 +2271,7 @@ class SemilavoratiTab(ctk.CTkFrame):
             return
         self.item_id = int(sel[0])
         self._copy_from_item_id = None
-        row = self.db.read_semi_item(self.item_id)
+        row = self._row_cache.get(self.item_id) or self.db.read_semi_item(self.item_id)
         self.var_type.set(_row_str(row, "type_desc"))
         self.var_state.set(_row_str(row, "state_desc"))
         self.var_mat.set(self._mat_label_from_id(row["material_id"]))
@@ -1986,44 +2279,37 @@ class SemilavoratiTab(ctk.CTkFrame):
         self.var_dim.set(_row_str(row, "dimensions"))
         self.var_std.set(_row_str(row, "standard"))
         self.var_notes.set(_row_str(row, "notes"))
-        self.box_dims.set_semi_item(self.item_id)
+        # Dopo save_item il box e gia allineato: la selezione riapplicata non lo ricarica.
+        type_desc = _row_str(row, "type_desc")
+        box = self._ensure_box_dims()
+        if not box.is_showing(self.item_id, type_desc):
+            box.set_semi_item(self.item_id, type_desc)
 
     def _select_item_row_if_present(self, item_id: Optional[int]):
         if item_id is None:
             return
         iid = str(item_id)
-        if self.tree.exists(iid):
+        if self._pager.reveal(iid):
             self.tree.selection_set(iid)
             self.tree.focus(iid)
             self.tree.see(iid)
 
     def _type_id_from_desc(self, desc: str) -> Optional[int]:
-        for tid, d in self._types:
-            if d == desc:
-                return tid
-        return None
+        return self._type_by_desc.get(desc)
 
     def _state_id_from_desc(self, desc: str) -> Optional[int]:
-        for sid, d in self._states:
-            if d == desc:
-                return sid
-        return None
+        return self._state_by_desc.get(desc)
 
     def _mat_id_from_label(self, label: str) -> Optional[int]:
-        for mid, l in self._materials:
-            if l == label:
-                return mid
-        return None
+        return self._mat_id_by_label.get(label)
 
     def _mat_label_from_id(self, material_id: Optional[int]) -> str:
         if not material_id:
-            return "—"
-        for mid, l in self._materials:
-            if mid == int(material_id):
-                return l
-        return "—"
+            return self.EMPTY_CHOICE
+        return self._mat_label_by_id.get(int(material_id), self.EMPTY_CHOICE)
 
     def save_item(self):
+        uppercase_vars(self._upper_vars)
         t_desc = (self.var_type.get() or "").strip()
         s_desc = (self.var_state.get() or "").strip()
         desc = (self.var_desc.get() or "").strip()
@@ -2036,7 +2322,7 @@ class SemilavoratiTab(ctk.CTkFrame):
             messagebox.showwarning("Semilavorati", "Famiglie/Stati non validi. Premi 'Rif.' e riprova.")
             return
         mat_label = (self.var_mat.get() or "").strip()
-        material_id = None if mat_label == "—" else self._mat_id_from_label(mat_label)
+        material_id = None if mat_label == self.EMPTY_CHOICE else self._mat_id_from_label(mat_label)
 
         payload = {
             "type_id": type_id,
@@ -2049,18 +2335,19 @@ class SemilavoratiTab(ctk.CTkFrame):
             "is_active": 1,
         }
         try:
+            self._row_cache.pop(self.item_id, None)
             if self.item_id is None:
                 self.item_id = self.db.create_semi_item(payload)
                 if self._copy_from_item_id is not None:
                     self.db.clone_semi_dimensions(self._copy_from_item_id, self.item_id)
                 self._copy_from_item_id = None
-                messagebox.showinfo("Semilavorati", "Creato.")
+                self._show_status("Creato.")
             else:
                 self.db.update_semi_item(self.item_id, payload)
-                messagebox.showinfo("Semilavorati", "Aggiornato.")
+                self._show_status("Aggiornato.")
             self.refresh_items()
             self._select_item_row_if_present(self.item_id)
-            self.box_dims.set_semi_item(self.item_id)
+            self._ensure_box_dims().set_semi_item(self.item_id)
         except Exception as e:
             messagebox.showerror("Semilavorati", f"Errore salvataggio: {e}")
 
@@ -2071,9 +2358,10 @@ class SemilavoratiTab(ctk.CTkFrame):
             return
         try:
             self.db.delete_semi_item(self.item_id)
+            self._row_cache.pop(self.item_id, None)
+            # new_item azzera gia la lista dimensionale.
             self.new_item()
             self.refresh_items()
-            self.box_dims.set_semi_item(None)
         except Exception as e:
             messagebox.showerror("Semilavorati", f"Errore eliminazione: {e}")
 
@@ -2,6 +2,8 @@
 
 import re
 import sqlite3
+from concurrent.futures import Future
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 
 import customtkinter as ctk
@@ -9,9 +11,14 @@ from tkinter import ttk, messagebox
 
 from .config import APP_NAME
 from .services import AppService
-from .ui_utils import bind_uppercase, make_treeview_sortable
+from .ui_utils import TreeviewPager, bind_uppercase, code_labels, debounced, make_treeview_sortable, run_in_background, set_widget_state, sync_treeview
 from .codifica import normalize_mmm, normalize_gggg_normati, is_valid_mmm, is_valid_gggg_normati
 
+# Progressivo finale del codice articolo (MMM-GGGG-SSSS).
+_SEQ_RE = re.compile(r"-(\d{4})$")
+# Colonne dell'elenco articoli, lette da sqlite3.Row in un'unica chiamata C.
+_ITEM_VALUES = itemgetter("pref_flag", "code", "cat_code", "sub_code", "description", "updated_at")
+
 
 class NormatiArticlesTab(ctk.CTkFrame):
     def __init__(self, master, db: AppService) -> None:
@@ -84,8 +91,9 @@ class NormatiArticlesTab(ctk.CTkFrame):
             self.tree.column(col, width=w, anchor=anch)
         self.tree.grid(row=0, column=0, sticky="nsew")
         tree_scroll = ttk.Scrollbar(tree_wrap, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=tree_scroll.set)
         tree_scroll.grid(row=0, column=1, sticky="ns")
+        # Solo la prima pagina di articoli diventa item Tk; le altre si inseriscono scorrendo.
+        self._pager = TreeviewPager(self.tree, tree_scroll)
         self.tree.bind("<<TreeviewSelect>>", self.on_select)
         make_treeview_sortable(self.tree)
 
@@ -139,23 +147,49 @@ class NormatiArticlesTab(ctk.CTkFrame):
 
         self._cats: List[sqlite3.Row] = []
         self._subs: List[sqlite3.Row] = []
+        self._cat_by_label: Dict[str, sqlite3.Row] = {}
         self._sub_by_label: Dict[str, sqlite3.Row] = {}
+        # Categoria (form e filtro) a cui si riferiscono i menu sotto-categoria gia costruiti.
+        self._subs_cat_id: Optional[int] = None
+        self._filter_subs_cat_id: Optional[int] = None
         self._rows_by_iid: Dict[str, sqlite3.Row] = {}
         self._list_filter_cat_by_label: Dict[str, sqlite3.Row] = {}
         self._list_filter_sub_by_label: Dict[str, sqlite3.Row] = {}
+        self._last_filter_key: Optional[tuple] = None
+        # Ricerca in corso sul thread di lettura (una nuova ricerca annulla quella in coda).
+        self._list_future: Optional[Future] = None
+        # Ricerca mentre si digita: una sola query quando l'utente si ferma.
+        self._search_soon = debounced(self, 150, self._on_search_changed)
 
         self.refresh_reference_data()
         self.refresh_list()
         self.new_item()
-
-    def refresh_reference_data(self) -> None:
-        self._cats = self.db.fetch_categories()
-        cat_values = [f"{c['code']} — {c['description']}" for c in self._cats] or ["—"]
+        self.q_var.trace_add("write", self._search_soon)
+
+    def refresh_reference_data(self, preferred_cat: Optional[str] = None) -> None:
+        """`preferred_cat`, se esiste, diventa la categoria corrente con un solo caricamento delle sotto-categorie."""
+        cats = self.db.fetch_categories()
+        if cats is self._cats:
+            # Stessa lista dalla cache del servizio: il DB non e cambiato, menu e filtri sono gia allineati.
+            if preferred_cat in self._cat_by_label and preferred_cat != self.var_cat.get():
+                self.var_cat.set(preferred_cat)
+                self.on_cat_changed(preferred_cat)
+            else:
+                # Template descrizione della sotto-categoria corrente (es. dopo "Nuovo").
+                self.on_sub_changed(self.var_sub.get())
+            return
+        self._cats = cats
+        self._subs_cat_id = None
+        self._cat_by_label = code_labels(self._cats)
+        cat_values = list(self._cat_by_label) or ["—"]
         self.om_cat.configure(values=cat_values)
         if self._cats:
-            if self.var_cat.get() not in cat_values:
-                self.var_cat.set(cat_values[0])
-            self.on_cat_changed(self.var_cat.get())
+            current = preferred_cat if preferred_cat in self._cat_by_label else self.var_cat.get()
+            if current not in self._cat_by_label:
+                current = cat_values[0]
+            if self.var_cat.get() != current:
+                self.var_cat.set(current)
+            self.on_cat_changed(current)
         else:
             self.var_cat.set("—")
             self.om_sub.configure(values=["—"])
@@ -166,67 +200,55 @@ class NormatiArticlesTab(ctk.CTkFrame):
         current_cat = self.var_filter_cat.get()
         current_sub = self.var_filter_sub.get()
 
-        cat_values = ["TUTTE"]
-        self._list_filter_cat_by_label = {}
-        for c in self._cats:
-            label = f"{c['code']} — {c['description']}"
-            cat_values.append(label)
-            self._list_filter_cat_by_label[label] = c
+        self._list_filter_cat_by_label = self._cat_by_label
+        cat_values = ["TUTTE", *self._list_filter_cat_by_label]
         self.om_filter_cat.configure(values=cat_values)
         if current_cat in cat_values:
             self.var_filter_cat.set(current_cat)
         else:
             self.var_filter_cat.set(cat_values[0])
 
-        self._refresh_sub_filter_values(preferred=current_sub)
+        self._refresh_sub_filter_values(preferred=current_sub, force=True)
 
-    def _refresh_sub_filter_values(self, preferred: Optional[str] = None) -> None:
+    def _refresh_sub_filter_values(self, preferred: Optional[str] = None, force: bool = False) -> None:
         cat = self._list_filter_cat_by_label.get(self.var_filter_cat.get())
-        sub_values = ["TUTTE"]
-        self._list_filter_sub_by_label = {}
-        if cat is not None:
-            for sc in self.db.fetch_subcategories(int(cat["id"])):
-                label = f"{sc['code']} — {sc['description']}"
-                sub_values.append(label)
-                self._list_filter_sub_by_label[label] = sc
-        self.om_filter_sub.configure(values=sub_values)
+        cat_id = int(cat["id"]) if cat is not None else None
+        # Stessa categoria filtro e anagrafiche invariate: il menu e gia quello giusto.
+        if force or cat_id != self._filter_subs_cat_id:
+            self._filter_subs_cat_id = cat_id
+            self._list_filter_sub_by_label = code_labels(self.db.fetch_subcategories(cat_id)) if cat_id is not None else {}
+            self.om_filter_sub.configure(values=["TUTTE", *self._list_filter_sub_by_label])
         target = preferred if preferred is not None else self.var_filter_sub.get()
-        if target in sub_values:
+        if target == "TUTTE" or target in self._list_filter_sub_by_label:
             self.var_filter_sub.set(target)
         else:
-            self.var_filter_sub.set(sub_values[0])
+            self.var_filter_sub.set("TUTTE")
 
     def on_list_filter_cat_changed(self, _val: str) -> None:
         self._refresh_sub_filter_values()
         self.refresh_list()
 
     def _get_selected_cat(self) -> Optional[sqlite3.Row]:
-        label = (self.var_cat.get() or "").strip()
-        if "—" not in label:
-            return None
-        code = label.split("—", 1)[0].strip()
-        return next((c for c in self._cats if c["code"] == code), None)
+        return self._cat_by_label.get(self.var_cat.get())
 
     def on_cat_changed(self, _val: str) -> None:
         cat = self._get_selected_cat()
         if not cat:
             self._subs = []
             self._sub_by_label = {}
+            self._subs_cat_id = None
             self.om_sub.configure(values=["—"])
             self.var_sub.set("—")
             return
-        self._subs = self.db.fetch_subcategories(int(cat["id"]))
-        sub_values = []
-        self._sub_by_label = {}
-        for sc in self._subs:
-            label = f"{sc['code']} — {sc['description']}"
-            sub_values.append(label)
-            self._sub_by_label[label] = sc
-        if not sub_values:
-            sub_values = ["—"]
-        self.om_sub.configure(values=sub_values)
-        if self.var_sub.get() not in sub_values:
-            self.var_sub.set(sub_values[0])
+        cat_id = int(cat["id"])
+        # Sotto-categorie ricaricate solo al cambio di categoria (o dopo un aggiornamento delle anagrafiche).
+        if cat_id != self._subs_cat_id:
+            self._subs_cat_id = cat_id
+            self._subs = self.db.fetch_subcategories(cat_id)
+            self._sub_by_label = code_labels(self._subs)
+            self.om_sub.configure(values=list(self._sub_by_label) or ["—"])
+        if self.var_sub.get() not in self._sub_by_label:
+            self.var_sub.set(next(iter(self._sub_by_label), "—"))
         self.on_sub_changed(self.var_sub.get())
 
     def on_sub_changed(self, _val: str) -> None:
@@ -241,23 +263,63 @@ class NormatiArticlesTab(ctk.CTkFrame):
         if tpl:
             self.var_desc.set(tpl)
 
-    def refresh_list(self) -> None:
+    def _list_filter_kwargs(self) -> Dict[str, Any]:
         cat = self._list_filter_cat_by_label.get(self.var_filter_cat.get())
         sc = self._list_filter_sub_by_label.get(self.var_filter_sub.get())
-        rows = self.db.search_items(
-            self.q_var.get(),
-            category_id=int(cat["id"]) if cat is not None else None,
-            subcategory_id=int(sc["id"]) if sc is not None else None,
-            only_preferred=bool(self.var_only_preferred.get()),
-        )
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        self._rows_by_iid = {}
-        for r in rows:
-            iid = str(r["id"])
-            self._rows_by_iid[iid] = r
-            pref = "X" if int(r["preferred"] or 0) else ""
-            self.tree.insert("", "end", iid=iid, values=(pref, r["code"], r["cat_code"], r["sub_code"], r["description"], r["updated_at"]))
+        return {
+            "q": self.q_var.get().strip(),
+            "category_id": int(cat["id"]) if cat is not None else None,
+            "subcategory_id": int(sc["id"]) if sc is not None else None,
+            "only_preferred": bool(self.var_only_preferred.get()),
+        }
+
+    def _on_search_changed(self) -> None:
+        # Spazi in coda o un testo riportato al valore precedente non rilanciano la ricerca.
+        if tuple(self._list_filter_kwargs().values()) != self._last_filter_key:
+            self.refresh_list()
+
+    def refresh_list(self) -> None:
+        """Rilegge l'elenco sul thread di lettura e lo applica al Treeview quando pronto."""
+        kwargs = self._list_filter_kwargs()
+        self._last_filter_key = tuple(kwargs.values())
+        if self._list_future is not None:
+            self._list_future.cancel()
+        future = self._list_future = self.db.submit_read("search_items", **kwargs)
+
+        def _done(rows):
+            if future is not self._list_future:
+                return  # superata da una ricerca piu recente
+            self._list_future = None
+            self._apply_list(rows)
+
+        def _failed(exc: BaseException):
+            if future is not self._list_future:
+                return
+            self._list_future = None
+            # Elenco non aggiornato: la stessa ricerca deve poter essere rilanciata.
+            self._last_filter_key = None
+            messagebox.showerror(APP_NAME, f"Errore ricerca articoli.\n\n{exc}")
+
+        run_in_background(self, future, _done, _failed)
+
+    def _apply_list(self, rows: List[sqlite3.Row]) -> None:
+        self._rows_by_iid = {str(r["id"]): r for r in rows}
+        self._pager.set_rows([(iid, _ITEM_VALUES(r)) for iid, r in self._rows_by_iid.items()])
+
+    def _refresh_list_row(self, item_id: int) -> None:
+        """Aggiorna solo la riga dell'articolo salvato, rispettando filtri e ordinamento dell'elenco."""
+        iid = str(item_id)
+        rows = self.db.search_items(item_id=item_id, **self._list_filter_kwargs())
+        if not rows:
+            # L'articolo non rientra piu nei filtri attivi.
+            self._rows_by_iid.pop(iid, None)
+            self._pager.remove(iid)
+            return
+        r = rows[0]
+        self._rows_by_iid[iid] = r
+        # Ordine elenco: preferiti prima, poi ultimo aggiornamento (la riga salvata e la piu recente).
+        idx = 0 if r["pref_flag"] else sum(1 for k, v in self._pager.shown.items() if v[0] and k != iid)
+        self._pager.upsert(iid, _ITEM_VALUES(r), idx)
 
     def new_item(self) -> None:
         self.current_item_id = None
@@ -290,18 +352,15 @@ class NormatiArticlesTab(ctk.CTkFrame):
                 self.current_seq = int(full["seq"])
                 self.var_code.set(full["code"])
 
-            cat_label = f"{full['cat_code']} — {full['cat_desc']}"
-            self.refresh_reference_data()
-            if cat_label in self.om_cat.cget("values"):
-                self.var_cat.set(cat_label)
-                self.on_cat_changed(cat_label)
+            # Anagrafiche riallineate solo se il DB e cambiato; la categoria dell'articolo e caricata una volta.
+            self.refresh_reference_data(preferred_cat=f"{full['cat_code']} — {full['cat_desc']}")
 
             sub_label = f"{full['sub_code']} — {full['sub_desc']}"
-            if sub_label in self.om_sub.cget("values"):
+            if sub_label in self._sub_by_label:
                 self.var_sub.set(sub_label)
 
             self.var_desc.set(full["description"] or "")
-            self.var_preferred.set(bool(int(full["preferred"] or 0)))
+            self.var_preferred.set(bool(full["preferred"]))
             self.txt_notes.delete("1.0", "end")
             self.txt_notes.insert("1.0", full["notes"] or "")
         finally:
@@ -338,17 +397,16 @@ class NormatiArticlesTab(ctk.CTkFrame):
         if not sc:
             raise ValueError("Sotto-categoria mancante")
 
-        standard_id = int(sc["standard_id"]) if sc["standard_id"] else None
-
         code = self.var_code.get().strip()
         if code == "—" or not code:
             self.generate_code()
             code = self.var_code.get().strip()
-
-        if self.current_seq is None:
-            m = re.search(r"-(\d{4})$", code)
+        elif self.current_seq is None:
+            # generate_code imposta gia current_seq: il codice si analizza solo se inserito a mano.
+            m = _SEQ_RE.search(code)
             self.current_seq = int(m.group(1)) if m else 0
 
+        # Dopo generate_code: il modello della sotto-categoria puo aver compilato la descrizione.
         desc = self.var_desc.get().strip()
         if not desc:
             raise ValueError("Descrizione mancante")
@@ -357,7 +415,7 @@ class NormatiArticlesTab(ctk.CTkFrame):
             "code": code,
             "category_id": int(cat["id"]),
             "subcategory_id": int(sc["id"]),
-            "standard_id": standard_id,
+            "standard_id": int(sc["standard_id"]) if sc["standard_id"] else None,
             "seq": int(self.current_seq),
             "description": desc,
             "notes": self.txt_notes.get("1.0", "end").strip(),
@@ -372,7 +430,9 @@ class NormatiArticlesTab(ctk.CTkFrame):
                 self.db.update_item(self.current_item_id, payload)
             else:
                 self.current_item_id = self.db.create_item(payload)
-            self.refresh_list()
+            self._refresh_list_row(self.current_item_id)
+            # L'elenco non coincide piu con l'ultima ricerca: la prossima va rieseguita.
+            self._last_filter_key = None
         except sqlite3.IntegrityError as e:
             messagebox.showerror(APP_NAME, f"Codice duplicato o vincolo violato.\n\n{e}")
         except Exception as e:
@@ -384,8 +444,10 @@ class NormatiArticlesTab(ctk.CTkFrame):
         if not messagebox.askyesno(APP_NAME, "Eliminare definitivamente l'articolo selezionato?"):
             return
         self.db.delete_item(self.current_item_id)
+        iid = str(self.current_item_id)
+        self._rows_by_iid.pop(iid, None)
+        self._pager.remove(iid)
         self.new_item()
-        self.refresh_list()
 
 
 
@@ -396,6 +458,8 @@ class NormatiCodingTab(ctk.CTkFrame):
         super().__init__(master)
         self.db = db
         self.refs_changed_callback = refs_changed_callback
+        # Click ravvicinati sulle categorie: un solo riallineamento del tab Articoli.
+        self._refs_changed_soon = debounced(self, 50, refs_changed_callback)
 
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -573,7 +637,14 @@ class NormatiCodingTab(ctk.CTkFrame):
         self._cats: List[sqlite3.Row] = []
         self._stds: List[sqlite3.Row] = []
         self._subs: List[sqlite3.Row] = []
+        self._cats_by_iid: Dict[str, sqlite3.Row] = {}
+        self._stds_by_iid: Dict[str, sqlite3.Row] = {}
+        self._subs_by_iid: Dict[str, sqlite3.Row] = {}
         self._std_by_code: Dict[str, int] = {}
+        # Righe mostrate nei tre elenchi: i refresh toccano solo le differenze, in un'unica passata Tcl.
+        self._cat_values: Dict[str, tuple] = {}
+        self._std_values: Dict[str, tuple] = {}
+        self._sub_values: Dict[str, tuple] = {}
 
         self.refresh_all()
 
@@ -585,27 +656,35 @@ class NormatiCodingTab(ctk.CTkFrame):
             self.on_cat_select()
         else:
             self.selected_category_id = None
-            self.refresh_standards()
-            self.refresh_subcategories()
-            self._rebuild_std_menu()
+            self.refresh_category_refs()
 
     def refresh_categories(self) -> None:
-        self._cats = self.db.fetch_categories()
-        for i in self.tree_cat.get_children():
-            self.tree_cat.delete(i)
-        for c in self._cats:
-            self.tree_cat.insert("", "end", iid=str(c["id"]), values=(c["code"], c["description"]))
-
-    def refresh_standards(self) -> None:
-        self._stds = []
-        for i in self.tree_std.get_children():
-            self.tree_std.delete(i)
-        if not self.selected_category_id:
-            self._rebuild_std_menu()
-            return
-        self._stds = self.db.fetch_standards(self.selected_category_id)
-        for s in self._stds:
-            self.tree_std.insert("", "end", iid=str(s["id"]), values=(s["code"], s["description"]))
+        cats = self.db.fetch_categories()
+        if cats is self._cats:
+            return  # stessa lista dalla cache del servizio: elenco e indice gia allineati
+        self._cats = cats
+        self._cats_by_iid = {str(c["id"]): c for c in self._cats}
+        rows = [(iid, (c["code"], c["description"])) for iid, c in self._cats_by_iid.items()]
+        self._cat_values = sync_treeview(self.tree_cat, rows, self._cat_values)
+
+    def refresh_category_refs(self) -> None:
+        """Norme e sotto-categorie della categoria selezionata, lette con un solo controllo dello stato del DB."""
+        stds, subs = self.db.fetch_category_refs(self.selected_category_id) if self.selected_category_id else ([], [])
+        self.refresh_standards(stds)
+        self.refresh_subcategories(subs)
+
+    def refresh_standards(self, prefetched: Optional[List[sqlite3.Row]] = None) -> None:
+        stds: List[sqlite3.Row] = []
+        if prefetched is not None:
+            stds = prefetched
+        elif self.selected_category_id:
+            stds = self.db.fetch_standards(self.selected_category_id)
+        if stds is self._stds:
+            return  # norme invariate: elenco, indice per codice e menu restano validi
+        self._stds = stds
+        self._stds_by_iid = {str(s["id"]): s for s in self._stds}
+        rows = [(iid, (s["code"], s["description"])) for iid, s in self._stds_by_iid.items()]
+        self._std_values = sync_treeview(self.tree_std, rows, self._std_values)
         self._rebuild_std_menu()
 
     def _rebuild_std_menu(self) -> None:
@@ -615,73 +694,77 @@ class NormatiCodingTab(ctk.CTkFrame):
         if self.var_sub_std.get() not in values:
             self.var_sub_std.set("—")
 
-    def refresh_subcategories(self) -> None:
-        self._subs = []
-        for i in self.tree_sub.get_children():
-            self.tree_sub.delete(i)
-        if not self.selected_category_id:
+    def refresh_subcategories(self, prefetched: Optional[List[sqlite3.Row]] = None) -> None:
+        subs: List[sqlite3.Row] = []
+        if prefetched is not None:
+            subs = prefetched
+        elif self.selected_category_id:
+            subs = self.db.fetch_subcategories(self.selected_category_id)
+        if subs is self._subs:
             return
-        self._subs = self.db.fetch_subcategories(self.selected_category_id)
-        for sc in self._subs:
-            self.tree_sub.insert("", "end", iid=str(sc["id"]), values=(sc["code"], sc["description"], sc["standard_code"] or ""))
+        self._subs = subs
+        self._subs_by_iid = {str(sc["id"]): sc for sc in self._subs}
+        rows = [(iid, (sc["code"], sc["description"], sc["standard_code"] or "")) for iid, sc in self._subs_by_iid.items()]
+        self._sub_values = sync_treeview(self.tree_sub, rows, self._sub_values)
 
     def on_cat_select(self, _evt=None) -> None:
         sel = self.tree_cat.selection()
         if not sel:
             return
-        cid = int(sel[0])
-        self.selected_category_id = cid
-        row = next((c for c in self._cats if int(c["id"]) == cid), None)
+        self.selected_category_id = int(sel[0])
+        row = self._cats_by_iid.get(sel[0])
         if row:
             self.var_cat_code.set(row["code"])
             self.var_cat_desc.set(row["description"])
-            self.ent_cat_code.configure(state="disabled")
+            set_widget_state(self.ent_cat_code, "disabled")
         else:
-            self.ent_cat_code.configure(state="normal")
+            set_widget_state(self.ent_cat_code, "normal")
 
-        self.refresh_standards()
-        self.refresh_subcategories()
+        self.refresh_category_refs()
         self.std_new()
         self.sub_new()
-        self.refs_changed_callback()
+        self._refs_changed_soon()
 
     def on_std_select(self, _evt=None) -> None:
         sel = self.tree_std.selection()
         if not sel:
             return
-        sid = int(sel[0])
-        self.selected_standard_id = sid
-        row = next((s for s in self._stds if int(s["id"]) == sid), None)
+        self.selected_standard_id = int(sel[0])
+        row = self._stds_by_iid.get(sel[0])
         if row:
             self.var_std_code.set(row["code"])
             self.var_std_desc.set(row["description"])
-            self.ent_std_code.configure(state="disabled")
+            set_widget_state(self.ent_std_code, "disabled")
         else:
-            self.ent_std_code.configure(state="normal")
+            set_widget_state(self.ent_std_code, "normal")
 
     def on_sub_select(self, _evt=None) -> None:
         sel = self.tree_sub.selection()
         if not sel:
             return
-        scid = int(sel[0])
-        self.selected_subcategory_id = scid
-        row = next((s for s in self._subs if int(s["id"]) == scid), None)
+        self.selected_subcategory_id = int(sel[0])
+        row = self._subs_by_iid.get(sel[0])
         if row:
             self.var_sub_code.set(row["code"])
             self.var_sub_desc.set(row["description"])
             self.var_sub_std.set(row["standard_code"] or "—")
-            self.ent_sub_code.configure(state="disabled")
-            self.txt_sub_tpl.delete("1.0", "end")
-            self.txt_sub_tpl.insert("1.0", row["desc_template"] or "")
+            set_widget_state(self.ent_sub_code, "disabled")
+            tpl = row["desc_template"] or ""
+            # Stesso template gia nel box: niente delete/insert (e nuovo layout del testo).
+            if self.txt_sub_tpl.get("1.0", "end-1c") != tpl:
+                self.txt_sub_tpl.delete("1.0", "end")
+                self.txt_sub_tpl.insert("1.0", tpl)
         else:
-            self.ent_sub_code.configure(state="normal")
+            set_widget_state(self.ent_sub_code, "normal")
 
     def cat_new(self) -> None:
-        self.tree_cat.selection_remove(self.tree_cat.selection())
+        sel = self.tree_cat.selection()
+        if sel:
+            self.tree_cat.selection_remove(sel)
         self.selected_category_id = None
         self.var_cat_code.set("")
         self.var_cat_desc.set("")
-        self.ent_cat_code.configure(state="normal")
+        set_widget_state(self.ent_cat_code, "normal")
 
     def cat_save(self) -> None:
         try:
@@ -696,7 +779,7 @@ class NormatiCodingTab(ctk.CTkFrame):
                     raise ValueError("CODICE categoria non valido: servono 3 numeri.")
                 self.db.create_category(code, desc)
             self.refresh_categories()
-            self.refs_changed_callback()
+            self._refs_changed_soon()
         except sqlite3.IntegrityError:
             messagebox.showerror(APP_NAME, "Codice categoria già esistente.")
         except Exception as e:
@@ -711,18 +794,20 @@ class NormatiCodingTab(ctk.CTkFrame):
             self.db.delete_category(self.selected_category_id)
             self.cat_new()
             self.refresh_all()
-            self.refs_changed_callback()
+            self._refs_changed_soon()
         except sqlite3.IntegrityError:
             messagebox.showerror(APP_NAME, "Impossibile eliminare: ci sono record collegati.")
         except Exception as e:
             messagebox.showerror(APP_NAME, f"Errore.\n\n{e}")
 
     def std_new(self) -> None:
-        self.tree_std.selection_remove(self.tree_std.selection())
+        sel = self.tree_std.selection()
+        if sel:
+            self.tree_std.selection_remove(sel)
         self.selected_standard_id = None
         self.var_std_code.set("")
         self.var_std_desc.set("")
-        self.ent_std_code.configure(state="normal")
+        set_widget_state(self.ent_std_code, "normal")
 
     def std_save(self) -> None:
         if not self.selected_category_id:
@@ -739,9 +824,8 @@ class NormatiCodingTab(ctk.CTkFrame):
                 self.db.update_standard(self.selected_standard_id, desc)
             else:
                 self.db.create_standard(self.selected_category_id, code, desc)
-            self.refresh_standards()
-            self.refresh_subcategories()
-            self.refs_changed_callback()
+            self.refresh_category_refs()
+            self._refs_changed_soon()
         except sqlite3.IntegrityError:
             messagebox.showerror(APP_NAME, "Codice norma già esistente per questa categoria.")
         except Exception as e:
@@ -755,21 +839,22 @@ class NormatiCodingTab(ctk.CTkFrame):
         try:
             self.db.delete_standard(self.selected_standard_id)
             self.std_new()
-            self.refresh_standards()
-            self.refresh_subcategories()
-            self.refs_changed_callback()
+            self.refresh_category_refs()
+            self._refs_changed_soon()
         except sqlite3.IntegrityError:
             messagebox.showerror(APP_NAME, "Impossibile eliminare: ci sono record collegati.")
         except Exception as e:
             messagebox.showerror(APP_NAME, f"Errore.\n\n{e}")
 
     def sub_new(self) -> None:
-        self.tree_sub.selection_remove(self.tree_sub.selection())
+        sel = self.tree_sub.selection()
+        if sel:
+            self.tree_sub.selection_remove(sel)
         self.selected_subcategory_id = None
         self.var_sub_code.set("")
         self.var_sub_desc.set("")
         self.var_sub_std.set("—")
-        self.ent_sub_code.configure(state="normal")
+        set_widget_state(self.ent_sub_code, "normal")
         self.txt_sub_tpl.delete("1.0", "end")
 
     def sub_save(self) -> None:
@@ -783,7 +868,7 @@ class NormatiCodingTab(ctk.CTkFrame):
                 raise ValueError("Descrizione sotto-categoria mancante.")
             std_code = self.var_sub_std.get().strip()
             standard_id = self._std_by_code.get(std_code) if std_code and std_code != "—" else None
-            tpl = self.txt_sub_tpl.get("1.0", "end").strip()
+            tpl = self.txt_sub_tpl.get("1.0", "end-1c").strip()
 
             if self.selected_subcategory_id:
                 self.db.update_subcategory(self.selected_subcategory_id, desc, standard_id, tpl)
@@ -792,7 +877,7 @@ class NormatiCodingTab(ctk.CTkFrame):
                     raise ValueError("CODICE sotto-categoria non valido: servono 4 numeri.")
                 self.db.create_subcategory(self.selected_category_id, code, desc, standard_id, tpl)
             self.refresh_subcategories()
-            self.refs_changed_callback()
+            self._refs_changed_soon()
         except sqlite3.IntegrityError:
             messagebox.showerror(APP_NAME, "Codice sotto-categoria già esistente per questa categoria.")
         except Exception as e:
@@ -807,7 +892,7 @@ class NormatiCodingTab(ctk.CTkFrame):
             self.db.delete_subcategory(self.selected_subcategory_id)
             self.sub_new()
             self.refresh_subcategories()
-            self.refs_changed_callback()
+            self._refs_changed_soon()
         except sqlite3.IntegrityError:
             messagebox.showerror(APP_NAME, "Impossibile eliminare: ci sono record collegati.")
         except Exception as e:
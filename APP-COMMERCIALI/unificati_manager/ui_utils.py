@@ -1,52 +1,362 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable, Optional
+import sys
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import customtkinter as ctk
-from tkinter import ttk
+from tkinter import messagebox, ttk
+
+from .config import APP_NAME
+
+
+_FONTS: Dict[Tuple[int, str], ctk.CTkFont] = {}
+
+
+def get_font(size: int, weight: str = "normal") -> ctk.CTkFont:
+    """CTkFont condiviso per (size, weight): creato alla prima richiesta e poi riusato."""
+    key = (size, weight)
+    font = _FONTS.get(key)
+    if font is None:
+        font = _FONTS[key] = ctk.CTkFont(size=size, weight=weight)
+    return font
+
+
+def _upper_from(v: str, last: str) -> str:
+    if v.isupper():
+        # Gia in MAIUSCOLO (caso tipico incollando o con Bloc Maiusc): nessuna nuova stringa.
+        return v
+    if last and v.startswith(last):
+        # Digitazione in coda: basta convertire il suffisso nuovo.
+        tail = v[len(last):]
+        return last + tail.upper() if not tail.isupper() else v
+    return v.upper()
 
 
 def bind_uppercase(var: ctk.StringVar) -> None:
     """Forza il contenuto in MAIUSCOLO (senza loop di callback)."""
-    state = {"busy": False}
+    state = {"busy": False, "last": ""}
 
     def _on_change(*_):
         if state["busy"]:
             return
+        v = var.get() or ""
+        up = state["last"] = _upper_from(v, state["last"])
+        if up == v:
+            return
         state["busy"] = True
         try:
-            v = (var.get() or "").upper()
-            if v != var.get():
-                var.set(v)
+            var.set(up)
         finally:
             state["busy"] = False
 
     var.trace_add("write", _on_change)
 
 
+def uppercase_vars(variables: Iterable[ctk.StringVar]) -> None:
+    """Porta in MAIUSCOLO le variabili indicate (set solo se il valore cambia)."""
+    for var in variables:
+        v = var.get() or ""
+        up = v.upper()
+        if up != v:
+            var.set(up)
+
+
+def uppercase_on_commit(entry: Any, var: ctk.StringVar) -> None:
+    """MAIUSCOLO applicato alla conferma del campo (uscita o Invio) invece che a ogni tasto."""
+
+    def _commit(_evt=None):
+        uppercase_vars((var,))
+
+    entry.bind("<FocusOut>", _commit, add="+")
+    entry.bind("<Return>", _commit, add="+")
+
+
+def code_labels(rows: Iterable[Any]) -> Dict[str, Any]:
+    """Mappa etichetta "CODICE — DESCRIZIONE" -> riga, nell'ordine delle righe."""
+    intern = sys.intern
+    return {intern(f"{r['code']} — {r['description']}"): r for r in rows}
+
+
+def debounced(widget: Any, delay_ms: int, fn: Callable[[], Any]) -> Callable[..., None]:
+    """Callback che esegue `fn` solo dopo `delay_ms` ms senza nuove chiamate (es. frecce su un elenco)."""
+    state = {"after": None}
+
+    def _run():
+        state["after"] = None
+        fn()
+
+    def _call(*_):
+        if state["after"] is not None:
+            widget.after_cancel(state["after"])
+        state["after"] = widget.after(delay_ms, _run)
+
+    return _call
+
+
+def set_option_values(menu: Any, values: Iterable[str]) -> None:
+    """configure(values=...) solo se l'elenco e cambiato: CTkOptionMenu ricostruisce il menu a ogni chiamata."""
+    values = list(values)
+    if getattr(menu, "_option_values", None) != values:
+        menu.configure(values=values)
+        menu._option_values = values
+
+
+def set_widget_state(widget: Any, state: str) -> None:
+    """configure(state=...) solo al cambio di stato (cget dei widget CTk non passa da Tcl)."""
+    if widget.cget("state") != state:
+        widget.configure(state=state)
+
+
+def run_in_background(
+    widget: Any,
+    future: Future,
+    on_done: Callable[[Any], None],
+    on_error: Optional[Callable[[BaseException], None]] = None,
+    poll_ms: int = 15,
+) -> None:
+    """Attende `future` senza bloccare il main loop e passa il risultato a `on_done` nel thread Tk (se non annullato).
+
+    Se il worker solleva un'eccezione viene chiamato `on_error` (default: messaggio di errore).
+    """
+
+    def _poll():
+        if not future.done():
+            widget.after(poll_ms, _poll)
+            return
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is None:
+            on_done(future.result())
+        elif on_error is not None:
+            on_error(exc)
+        else:
+            messagebox.showerror(APP_NAME, f"Errore lettura dati.\n\n{exc}")
+
+    widget.after(poll_ms, _poll)
+
+
+class AutocompleteCombobox(ttk.Combobox):
+    """Combobox in sola lettura con ricerca per prefisso da tastiera (API compatibile con CTkOptionMenu)."""
+
+    def __init__(self, master, variable=None, values=(), command: Optional[Callable[[str], Any]] = None, **kwargs) -> None:
+        kwargs.setdefault("state", "readonly")
+        super().__init__(master, textvariable=variable, values=list(values), **kwargs)
+        self._command = command
+        self._prefix = ""
+        self._prefix_after = None
+        self.bind("<<ComboboxSelected>>", self._on_selected)
+        self.bind("<KeyPress>", self._on_key)
+
+    def _on_selected(self, _evt=None) -> None:
+        if self._command is not None:
+            self._command(self.get())
+
+    def _reset_prefix(self) -> None:
+        self._prefix = ""
+        self._prefix_after = None
+
+    def _on_key(self, evt):
+        if not evt.char or not evt.char.isprintable():
+            return None
+        if self._prefix_after is not None:
+            self.after_cancel(self._prefix_after)
+        self._prefix += evt.char.upper()
+        self._prefix_after = self.after(800, self._reset_prefix)
+        for v in self.cget("values"):
+            if str(v).upper().startswith(self._prefix):
+                if v != self.get():
+                    self.set(v)
+                    self._on_selected()
+                break
+        return "break"
+
+
+# Oltre questa soglia di inserimenti il Treeview viene nascosto durante il caricamento.
+_BULK_HIDE_THRESHOLD = 200
+
+
+_BULK_INSERT_PROC = "::_unificati_tv_insert"
+_bulk_insert_interps: set = set()
+
+
+def insert_rows(tree: ttk.Treeview, rows: List[Tuple[str, tuple]]) -> None:
+    """Inserisce in coda le righe (iid, values) con un'unica chiamata Tcl invece di una per riga."""
+    if not rows:
+        return
+    tk = tree.tk
+    if id(tk) not in _bulk_insert_interps:
+        tk.call("proc", _BULK_INSERT_PROC, ("w", "rows"), "foreach {id vals} $rows {$w insert {} end -id $id -values $vals}")
+        _bulk_insert_interps.add(id(tk))
+    # Le tuple diventano liste Tcl: nessun quoting manuale dei valori.
+    tk.call(_BULK_INSERT_PROC, tree._w, tuple(x for iid, values in rows for x in (iid, values)))
+
+
+def clear_treeview(tree: ttk.Treeview) -> None:
+    """Svuota il Treeview con un'unica chiamata Tcl."""
+    children = tree.get_children("")
+    if children:
+        tree.delete(*children)
+
+
+def mark_treeview_changed(tree: ttk.Treeview) -> None:
+    """Segnala che i dati del Treeview sono cambiati (invalida la cache di ordinamento)."""
+    tree._data_generation = getattr(tree, "_data_generation", 0) + 1
+
+
+def sync_treeview(tree: ttk.Treeview, rows: List[Tuple[str, tuple]], shown: Dict[str, tuple]) -> Dict[str, tuple]:
+    """Allinea il Treeview alle righe (iid, values) toccando solo le differenze.
+
+    `shown` e lo snapshot restituito dalla chiamata precedente; ritorna il nuovo snapshot.
+    """
+    new = dict(rows)
+    stale = [iid for iid in shown if iid not in new]
+    if stale:
+        tree.delete(*stale)
+    to_insert = [(iid, values) for iid, values in rows if iid not in shown]
+    hidden = len(to_insert) >= _BULK_HIDE_THRESHOLD and tree.winfo_manager() == "grid"
+    if hidden:
+        tree.grid_remove()
+    changed = bool(stale or to_insert)
+    try:
+        insert_rows(tree, to_insert)
+        # Chiamata Tcl diretta: evita la conversione dei kwargs di Treeview.item per ogni riga modificata.
+        call, w, get_old = tree.tk.call, tree._w, shown.get
+        for iid, values in rows:
+            old = get_old(iid)
+            if old is not None and old != values:
+                call(w, "item", iid, "-values", values)
+                changed = True
+        if shown:
+            # Un unico riordino (anche dopo un ordinamento per colonna) invece di N move.
+            order = [iid for iid, _ in rows]
+            if list(tree.get_children("")) != order:
+                tree.set_children("", *order)
+    finally:
+        if hidden:
+            tree.grid()
+        if changed:
+            mark_treeview_changed(tree)
+    return new
+
+
+class TreeviewPager:
+    """Materializza le righe di un Treeview a pagine: le successive si inseriscono quando lo scroll arriva in fondo."""
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, page_size: int = 200) -> None:
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.page_size = page_size
+        self.shown: Dict[str, tuple] = {}
+        self._pending: List[Tuple[str, tuple]] = []
+        self._scheduled = False
+        tree.configure(yscrollcommand=self._on_yscroll)
+        # L'ordinamento per colonna deve vedere tutte le righe.
+        tree.bind("<<TreeviewBeforeSort>>", lambda _e: self.load_all(), add="+")
+
+    def set_rows(self, rows: List[Tuple[str, tuple]]) -> None:
+        head, self._pending = rows[: self.page_size], rows[self.page_size :]
+        self.shown = sync_treeview(self.tree, head, self.shown)
+
+    def load_more(self) -> None:
+        self._scheduled = False
+        chunk, self._pending = self._pending[: self.page_size], self._pending[self.page_size :]
+        insert_rows(self.tree, chunk)
+        self.shown.update(chunk)
+        if chunk:
+            mark_treeview_changed(self.tree)
+
+    def load_all(self) -> None:
+        while self._pending:
+            self.load_more()
+
+    def upsert(self, iid: str, values: tuple, index: Any = "end") -> None:
+        """Aggiorna o inserisce una sola riga in posizione `index`, mantenendo coerente lo snapshot."""
+        self._pending = [p for p in self._pending if p[0] != iid]
+        if iid in self.shown:
+            self.tree.item(iid, values=values)
+            self.tree.move(iid, "", index)
+        else:
+            self.tree.insert("", index, iid=iid, values=values)
+        self.shown[iid] = values
+        mark_treeview_changed(self.tree)
+
+    def values(self, iid: str) -> Optional[tuple]:
+        """Valori correnti della riga, anche se non ancora materializzata."""
+        if iid in self.shown:
+            return self.shown[iid]
+        return next((v for i, v in self._pending if i == iid), None)
+
+    def update(self, iid: str, values: tuple) -> None:
+        """Sostituisce i valori della riga lasciandola nella sua posizione."""
+        if iid in self.shown:
+            self.tree.tk.call(self.tree._w, "item", iid, "-values", values)
+            self.shown[iid] = values
+            mark_treeview_changed(self.tree)
+        else:
+            self._pending = [(i, values if i == iid else v) for i, v in self._pending]
+
+    def remove(self, iid: str) -> None:
+        self._pending = [p for p in self._pending if p[0] != iid]
+        if self.shown.pop(iid, None) is not None:
+            self.tree.delete(iid)
+            mark_treeview_changed(self.tree)
+
+    def reveal(self, iid: str) -> bool:
+        """Carica le pagine necessarie finche `iid` e presente; False se non e tra le righe."""
+        # Appartenenza verificata sullo snapshot Python, senza chiamate Tcl.
+        if iid in self.shown:
+            return True
+        if not any(i == iid for i, _ in self._pending):
+            return False
+        while iid not in self.shown:
+            self.load_more()
+        return True
+
+    def _on_yscroll(self, first, last) -> None:
+        self.scrollbar.set(first, last)
+        if self._pending and not self._scheduled and float(last) >= 0.9:
+            self._scheduled = True
+            self.tree.after_idle(self.load_more)
+
+
+_NUMBER_RE = re.compile(r"-?\d+([.,]\d+)?")
+
+
 def make_treeview_sortable(tree: ttk.Treeview, numeric_cols: Optional[Iterable[str]] = None) -> None:
     numeric_cols = set(numeric_cols or [])
+    # Valori e chiavi di ordinamento restano validi finche il Treeview non segnala modifiche
+    # (mark_treeview_changed); per gli elenchi non gestiti si rileggono a ogni click.
+    cache: Dict[str, Any] = {"gen": None, "rows": {}, "keys": {}, "orders": {}}
 
     def _convert(v: str, col: str):
         v = (v or "").strip()
-        if col in numeric_cols:
-            try:
-                return float(v.replace(",", "."))
-            except Exception:
-                return v.lower()
-        if re.fullmatch(r"-?\d+([.,]\d+)?", v):
+        # Regex solo se il valore puo essere un numero (prima cifra o segno meno).
+        if col in numeric_cols or ((v[:1].isdigit() or v[:1] == "-") and _NUMBER_RE.fullmatch(v)):
             try:
                 return float(v.replace(",", "."))
-            except Exception:
+            except ValueError:
                 pass
         return v.lower()
 
     def _sort(col: str, reverse: bool):
-        data = [(tree.set(k, col), k) for k in tree.get_children("")]
-        data.sort(key=lambda t: _convert(t[0], col), reverse=reverse)
-        for idx, (_, k) in enumerate(data):
-            tree.move(k, "", idx)
+        tree.event_generate("<<TreeviewBeforeSort>>")
+        gen = getattr(tree, "_data_generation", None)
+        if gen is None or cache["gen"] != gen:
+            cache["gen"] = gen
+            cache["rows"] = {k: tree.set(k) for k in tree.get_children("")}
+            cache["keys"] = {}
+            cache["orders"] = {}
+        order = cache["orders"].get((col, reverse))
+        if order is None:
+            keys = cache["keys"].get(col)
+            if keys is None:
+                keys = cache["keys"][col] = {k: _convert(vals.get(col, ""), col) for k, vals in cache["rows"].items()}
+            order = cache["orders"][(col, reverse)] = sorted(keys, key=keys.__getitem__, reverse=reverse)
+        # Un solo set_children riordina tutte le righe (nessun move/detach per riga).
+        tree.set_children("", *order)
         tree.heading(col, command=lambda: _sort(col, not reverse))
 
     for col in tree["columns"]:
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
 import os
+import time
 from datetime import datetime
 
 from .config import DATE_FMT
 
+# DATE_FMT arriva al secondo: nello stesso secondo la stringa non cambia e si riusa.
+_NOW_MEMO_OK = "%f" not in DATE_FMT
+_now_last = (-1, "")
+
 
 def now_str() -> str:
-    return datetime.now().strftime(DATE_FMT)
+    global _now_last
+    if not _NOW_MEMO_OK:
+        return datetime.now().strftime(DATE_FMT)
+    sec = int(time.time())
+    last = _now_last
+    if last[0] == sec:
+        return last[1]
+    s = datetime.fromtimestamp(sec).strftime(DATE_FMT)
+    _now_last = (sec, s)
+    return s
 
 
 def normalize_upper(s: str) -> str:
@@ -15,4 +29,6 @@ def normalize_upper(s: str) -> str:
 
 
 def ensure_dir(path: str) -> None:
-    os.makedirs(path, exist_ok=True)
+    # Caso comune (cartella gia presente): un solo stat.
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)